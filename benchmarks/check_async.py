@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generators import erdos_renyi, path  # noqa: E402
+from graph_utils import AsyncGraph, Graph, Node  # noqa: E402
+
+
+class _SlowGraph(Graph):
+
+    def __init__(self, *args, delay=0.0005, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+        self.running = 0
+        self.higher_running = 0
+        self._running_lock = threading.Lock()
+
+    def slow_scan(self, tag=None):
+        with self._running_lock:
+            self.running += 1
+            self.higher_running = max(self.higher_running, self.running)
+        try:
+            number_connections = 0
+            for _ in self.connections:
+                time.sleep(self.delay)
+                number_connections += 1
+            return number_connections
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+
+def _slow_path(number_nodes):
+    graph = _SlowGraph()
+    nodes = [Node(node_id=node_id) for node_id in range(number_nodes)]
+    graph.include_nodes(nodes)
+    graph.add_connections([(node_1, node_2, 1)
+                           for node_1, node_2 in zip(nodes, nodes[1:])])
+    return graph, nodes
+
+
+async def _check_coalescing(size, failures):
+    graph = erdos_renyi(size, seed=1)
+    async with AsyncGraph(graph) as async_graph:
+        diameters = await asyncio.gather(*(async_graph.diameter()
+                                           for _ in range(5)))
+        stats = async_graph.stats()
+    if diameters != [graph.diameter]*5:
+        failures.append(('coalescing', graph.diameter, diameters))
+    if stats['computed'] != 1 or stats['coalesced'] != 4:
+        failures.append(('coalescing_stats', stats))
+
+
+async def _check_batching(size, failures):
+    graph = erdos_renyi(size, seed=2)
+    nodes = sorted(graph.nodes, key=lambda node: node.node_id)
+    source, targets = nodes[0], nodes[:11]
+    async with AsyncGraph(graph, batch_delay=0.01) as async_graph:
+        distances = await async_graph.distances((source, target)
+                                                for target in targets)
+        stats = async_graph.stats()
+    expected = [graph.distance_between_not_weighted(source, target)
+                for target in targets]
+    if distances != expected:
+        failures.append(('batching', expected, distances))
+    if stats['computed'] != 1 or stats['batched'] != len(targets) - 1:
+        failures.append(('batching_stats', stats))
+
+
+async def _check_backpressure(failures):
+    graph, _ = _slow_path(40)
+    async_graph = AsyncGraph(graph, max_concurrency=2, max_pending=3)
+    higher_in_flight = 0
+
+    async def watch():
+        nonlocal higher_in_flight
+        while True:
+            higher_in_flight = max(higher_in_flight,
+                                   len(async_graph._in_flight))
+            await asyncio.sleep(0.001)
+
+    watcher = asyncio.ensure_future(watch())
+    try:
+        results = await asyncio.gather(*(async_graph.query('slow_scan', tag)
+                                         for tag in range(8)))
+    finally:
+        watcher.cancel()
+        await async_graph.close()
+    if results != [len(graph.connections)]*8:
+        failures.append(('backpressure', results))
+    if graph.higher_running > 2 or higher_in_flight > 3:
+        failures.append(('backpressure_limits', graph.higher_running,
+                         higher_in_flight))
+
+
+async def _check_mutation(failures):
+    graph, nodes = _slow_path(60)
+    before = len(graph.connections)
+    async with AsyncGraph(graph) as async_graph:
+        scan = asyncio.ensure_future(async_graph.query('slow_scan'))
+        await asyncio.sleep(0.005)
+        try:
+            await async_graph.add_connection(nodes[0], nodes[-1])
+            scanned = await scan
+        except RuntimeError as error:
+            failures.append(('mutation', repr(error)))
+            return
+        after = await async_graph.query('slow_scan')
+    if scanned != before or after != before + 2:
+        failures.append(('mutation', before, scanned, after))
+
+
+async def _check_process_mutation(failures):
+    graph = path(60)
+    nodes = sorted(graph.nodes, key=lambda node: node.node_id)
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        async with AsyncGraph(graph, executor=executor) as async_graph:
+            diameter = asyncio.ensure_future(async_graph.diameter())
+            await asyncio.sleep(0.005)
+            await async_graph.add_connection(nodes[0], nodes[-1])
+            before = await diameter
+            after = await async_graph.diameter()
+    if before != 59 or after != 30:
+        failures.append(('process_mutation', before, after))
+
+
+def run(size=300):
+    results = dict()
+    for name, check in (('coalescing', partial(_check_coalescing, size)),
+                        ('batching', partial(_check_batching, size)),
+                        ('backpressure', _check_backpressure),
+                        ('mutation', _check_mutation),
+                        ('process_mutation', _check_process_mutation)):
+        failures = list()
+        asyncio.run(check(failures))
+        results[name] = failures
+    return results
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description='Check AsyncGraph coalescing, batching, backpressure '
+                    'and mutation while queries run.')
+    parser.add_argument('--size', type=int, default=300)
+    options = parser.parse_args(arguments)
+
+    results = run(options.size)
+    failed = False
+    for name, failures in results.items():
+        print(f'{name}: {"ok" if not failures else "FAILED"}')
+        for failure in failures[:10]:
+            print(f'  {failure}', file=sys.stderr)
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
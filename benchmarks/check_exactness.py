@@ -0,0 +1,442 @@
+import argparse
+import gzip
+import math
+import os
+import random
+import sys
+import tempfile
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generators import GENERATORS, erdos_renyi  # noqa: E402
+from graph_utils import FrozenGraph, Graph, Node  # noqa: E402
+
+
+def _reference_distances(node_from):
+    distances = {node_from: 0}
+    to_check = deque([node_from])
+    while to_check:
+        node = to_check.popleft()
+        for connection in node.connections:
+            if connection.node_to not in distances:
+                distances[connection.node_to] = distances[node] + 1
+                to_check.append(connection.node_to)
+    return distances
+
+
+def _reference_distance(node_from, node_to):
+    if node_from is node_to:
+        return False
+    return _reference_distances(node_from).get(node_to, False)
+
+
+def _reference_diameter(graph):
+    if not graph.nodes:
+        return None
+    higher_distance = max(max(_reference_distances(node).values())
+                          for node in graph.nodes)
+    return higher_distance if higher_distance else False
+
+
+def _reference_averege_distance(graph):
+    number_nodes = graph.order
+    distance_sum = sum(sum(_reference_distances(node).values())
+                       for node in graph.nodes)
+    return distance_sum/(number_nodes*(number_nodes-1))
+
+
+def _reference_clustering(node):
+    adjacent = [connection.node_to for connection in node.connections]
+    adjacent_set = set(adjacent)
+    links = sum(1 for other in adjacent for connection in other.connections
+                if connection.node_to in adjacent_set)
+    number_adjacent = len(adjacent)
+    if number_adjacent < 2:
+        return 0
+    return links/(number_adjacent*(number_adjacent-1))
+
+
+def _reference_triangles(graph):
+    neighbors = {node: set() for node in graph.nodes}
+    for connection in graph.connections:
+        node_from, node_to = connection.node_from, connection.node_to
+        if node_from is not node_to:
+            neighbors[node_from].add(node_to)
+            neighbors[node_to].add(node_from)
+    return {node: sum(1 for first in adjacent for second in adjacent
+                      if second in neighbors[first])//2
+            for node, adjacent in neighbors.items()}
+
+
+def _graphs(number, size, seed):
+    generator = random.Random(seed)
+    for position in range(number):
+        is_directional = position % 2 == 1
+        averege_degree = generator.choice([1, 2, 4, 8])
+        yield f'erdos_renyi-{position}', erdos_renyi(
+            size, averege_degree=averege_degree,
+            seed=generator.randrange(2**32), is_directional=is_directional)
+    for name, build in GENERATORS.items():
+        yield name, build(size, seed=seed)
+
+
+def _check_distances(graph, pairs, failures):
+    for node_from, node_to in pairs:
+        expected = _reference_distance(node_from, node_to)
+        distance = graph.distance_between_not_weighted(node_from, node_to)
+        if distance != expected:
+            failures.append(('distance', node_from.node_id, node_to.node_id,
+                             expected, distance))
+            continue
+        distance, path = graph.distance_between_not_weighted(
+            node_from, node_to, path=True)
+        if distance is False:
+            valid = path == []
+        else:
+            valid = len(path) == distance + 1 and path[0] is node_from\
+                and path[-1] is node_to\
+                and all(node_2 in node_1.connected_to()
+                        for node_1, node_2 in zip(path, path[1:]))
+        if distance != expected or not valid:
+            failures.append(('path', node_from.node_id, node_to.node_id,
+                             expected, path))
+
+
+def _check_clustering(graph, failures):
+    coefficients = graph.clustering_coefficients()
+    for node in graph.nodes:
+        expected = _reference_clustering(node)
+        if not math.isclose(coefficients[node], expected, abs_tol=1e-12):
+            failures.append(('clustering', node.node_id, expected,
+                             coefficients[node]))
+    expected = _reference_triangles(graph)
+    triangles = graph.triangles()
+    if triangles != expected:
+        failures.append(('triangles', sum(expected.values())//3,
+                         sum(triangles.values())//3))
+    if graph.triangle_count != sum(expected.values())//3:
+        failures.append(('triangle_count', sum(expected.values())//3,
+                         graph.triangle_count))
+
+
+def _check_diameter(graph, failures):
+    expected = _reference_diameter(graph)
+    for name, diameter in (('diameter', graph.diameter),
+                           ('pruned_diameter', graph.pruned_diameter())):
+        if diameter != expected:
+            failures.append((name, expected, diameter))
+    if graph.order > 1:
+        expected = _reference_averege_distance(graph)
+        estimate = graph.sample_distances(sample_size=graph.order, seed=0)
+        if not math.isclose(estimate.averege_distance, expected):
+            failures.append(('sample_distances', expected,
+                             estimate.averege_distance))
+
+
+def _relabelled(graph, generator):
+    copy = Graph(is_directional=graph.is_directional, is_weighted=True)
+    nodes = {node: Node(node_id=f'node-{node.node_id}')
+             for node in graph.nodes}
+    copy.include_nodes(list(nodes.values()))
+    copy.add_connections([(nodes[connection.node_from],
+                           nodes[connection.node_to],
+                           generator.choice([1, 2, 0.5]))
+                          for connection in graph.connections],
+                         is_directional=True)
+    return copy
+
+
+def _edges(graph):
+    return sorted((str(connection.node_from.node_id),
+                   str(connection.node_to.node_id), connection.weight)
+                  for connection in graph.connections)
+
+
+def _check_save_load(graph, generator, failures):
+    with tempfile.TemporaryDirectory() as directory:
+        for original in (graph, _relabelled(graph, generator)):
+            path = os.path.join(directory, 'graph.pygu')
+            original.save(path)
+            loaded = Graph.load(path)
+            if {node.node_id for node in loaded.nodes}\
+                    != {node.node_id for node in original.nodes}\
+                    or _edges(loaded) != _edges(original)\
+                    or loaded.is_directional != original.is_directional:
+                failures.append(('save_load', type(
+                    next(iter(original.nodes)).node_id).__name__))
+            with open(path, 'rb') as file:
+                data = file.read()
+            truncated = os.path.join(directory, 'truncated.pygu')
+            for length in (len(data) - 1, len(data)//2,
+                           FrozenGraph.file_header.size - 1):
+                with open(truncated, 'wb') as file:
+                    file.write(data[:length])
+                try:
+                    FrozenGraph.load(truncated)
+                except ValueError:
+                    continue
+                failures.append(('truncated_load', length))
+
+
+def _check_frozen(graph, pairs, generator, failures):
+    frozen = graph.freeze()
+    for name in ('order', 'size', 'diameter'):
+        if getattr(frozen, name) != getattr(graph, name):
+            failures.append(('frozen_' + name, getattr(graph, name),
+                             getattr(frozen, name)))
+    for name in ('density', 'averege_distance', 'averege_clustering'):
+        if graph.order > 1 and not math.isclose(
+                getattr(frozen, name), getattr(graph, name)):
+            failures.append(('frozen_' + name, getattr(graph, name),
+                             getattr(frozen, name)))
+    eccentricities = {node.node_id: eccentricity for node, eccentricity
+                      in graph.eccentricities().items()}
+    if frozen.eccentricities() != eccentricities:
+        failures.append(('frozen_eccentricities',))
+    for node_from, node_to in pairs:
+        expected = _reference_distance(node_from, node_to)
+        distance = frozen.distance_between_not_weighted(node_from, node_to)
+        if distance != expected:
+            failures.append(('frozen_distance', node_from.node_id,
+                             node_to.node_id, expected, distance))
+    for node in list(graph.nodes)[:20]:
+        expected = {reached.node_id: distance for reached, distance
+                    in _reference_distances(node).items()}
+        depths = {node_id: depth for node_id, depth, _ in frozen.bfs(node)}
+        if frozen.distances_from(node) != expected or depths != expected:
+            failures.append(('frozen_distances_from', node.node_id))
+        if frozen.degree(node) != len(node.connections):
+            failures.append(('frozen_degree', node.node_id))
+        if not math.isclose(frozen.clustering_coefficient(node),
+                            _reference_clustering(node), abs_tol=1e-12):
+            failures.append(('frozen_clustering', node.node_id))
+
+    weighted = _relabelled(graph, generator)
+    frozen = weighted.freeze()
+    for node_from, node_to in pairs:
+        node_from = weighted.get_node(f'node-{node_from.node_id}')
+        node_to = weighted.get_node(f'node-{node_to.node_id}')
+        expected = weighted.distance_between_weighted(node_from, node_to)
+        distance = frozen.distance_between_weighted(node_from, node_to)
+        if distance != expected:
+            failures.append(('frozen_weighted_distance', node_from.node_id,
+                             node_to.node_id, expected, distance))
+
+
+def _write_edge_list(path, rows, comment):
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'wt') as file:
+        for position, row in enumerate(rows):
+            if position % 10 == 0:
+                file.write(f'{comment} comment\n  {comment} indented\n\n')
+            file.write(row + '\n')
+
+
+def _check_edge_list(graph, generator, failures):
+    formats = (
+        ('edges.txt', '#', '{node_from}\t{node_to} {weight}',
+         dict(weight_column=2, skip_header=True)),
+        ('edges.csv.gz', '%', '{node_to},{node_from},{weight}',
+         dict(delimiter=',', comments='%', source_column=1,
+              target_column=0, weight_column=2, chunk_size=7)),
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for original, node_id in ((graph, int),
+                                  (_relabelled(graph, generator), str)):
+            for name, comment, row, options in formats:
+                path = os.path.join(directory, name)
+                rows = [row.format(node_from=connection.node_from.node_id,
+                                   node_to=connection.node_to.node_id,
+                                   weight=connection.weight)
+                        for connection in original.connections]
+                if options.get('skip_header'):
+                    rows.insert(0, 'source target weight')
+                _write_edge_list(path, rows, comment)
+                loaded = Graph(is_directional=True)
+                status = loaded.edge_list_to_graph(
+                    path, is_directional=True, node_id=node_id, **options)
+                chunk_size = options.get('chunk_size', 100000)
+                number_edges = len(original.connections)
+                if _edges(loaded) != _edges(original)\
+                        or status.edges != number_edges\
+                        or status.chunks != -(-number_edges//chunk_size):
+                    failures.append(('edge_list', name,
+                                     node_id.__name__, status.edges,
+                                     status.chunks))
+
+
+def _check_distance_cache(graph, pairs, failures):
+    for maxsize, trees in ((None, None), (8, 2)):
+        cached = _induced_copy((graph,), graph.nodes)
+        cache = cached.enable_distance_cache(maxsize=maxsize, trees=trees)
+        cached_pairs = [(cached.get_node(node_from.node_id),
+                         cached.get_node(node_to.node_id))
+                        for node_from, node_to in pairs]
+        cached.distance_summary()
+        for _ in range(2):
+            for node_from, node_to in cached_pairs:
+                expected = _reference_distance(node_from, node_to)
+                distance = cached.distance_between_not_weighted(node_from,
+                                                                node_to)
+                if distance != expected:
+                    failures.append(('distance_cache', maxsize,
+                                     node_from.node_id, node_to.node_id,
+                                     expected, distance))
+        info = cache.info()
+        if maxsize is None and info.hits < len(cached_pairs)\
+                or maxsize is not None and info.currsize > maxsize\
+                or trees is not None and len(cache.trees) > trees:
+            failures.append(('distance_cache_info', maxsize, info,
+                             cache.tree_info()))
+
+        node_from, node_to = next(
+            ((node_from, node_to) for node_from, node_to in cached_pairs
+             if node_from is not node_to
+             and _reference_distance(node_from, node_to) != 1),
+            (None, None))
+        if node_from is None:
+            continue
+        cached.add_connection(node_from, node_to)
+        isolated = Node(node_id=-1)
+        cached.include_node(isolated)
+        for node_1, node_2 in cached_pairs + [(node_from, isolated)]:
+            expected = _reference_distance(node_1, node_2)
+            distance = cached.distance_between_not_weighted(node_1, node_2)
+            if distance != expected:
+                failures.append(('distance_cache_invalidation', maxsize,
+                                 node_1.node_id, node_2.node_id, expected,
+                                 distance))
+
+
+def _metrics(graph, id_pairs):
+    metrics = {name: getattr(graph, name)
+               for name in ('order', 'size', 'averege_degree', 'diameter',
+                            'averege_clustering', 'triangle_count')}
+    if graph.order > 1:
+        metrics['averege_distance'] = graph.averege_distance
+    metrics['pruned_diameter'] = graph.pruned_diameter()
+    metrics['degree_histogram'] = graph.degree_histogram()
+    metrics['component_sizes'] = graph.component_sizes()
+    metrics['eccentricities'] = {node.node_id: eccentricity
+                                 for node, eccentricity
+                                 in graph.eccentricities().items()}
+    metrics['distances'] = [graph.distance_between_not_weighted(
+                                graph.get_node(node_id_1),
+                                graph.get_node(node_id_2))
+                            for node_id_1, node_id_2 in id_pairs]
+    return metrics
+
+
+def _induced_copy(graphs, nodes):
+    copy = Graph(is_directional=graphs[0].is_directional)
+    copies = {node: Node(node_id=node.node_id) for node in nodes}
+    copy.include_nodes(list(copies.values()))
+    copy.add_connections([(copies[connection.node_from],
+                           copies[connection.node_to], connection.weight)
+                          for graph in graphs
+                          for connection in graph.connections
+                          if connection.node_from in copies
+                          and connection.node_to in copies],
+                         is_directional=True)
+    return copy
+
+
+def _check_metrics(name, view, copy, id_pairs, failures):
+    expected = _metrics(copy, id_pairs)
+    for metric, value in _metrics(view, id_pairs).items():
+        if isinstance(value, float) and isinstance(expected[metric], float):
+            same = math.isclose(value, expected[metric])
+        else:
+            same = value == expected[metric]
+        if not same:
+            failures.append((name + '_' + metric, expected[metric], value))
+
+
+def _check_union_view(graph, pairs, generator, failures):
+    other = _relabelled(graph, generator)
+    id_pairs = [(node_from.node_id, node_to.node_id)
+                for node_from, node_to in pairs]
+    id_pairs += [(node_from.node_id, f'node-{node_to.node_id}')
+                 for node_from, node_to in pairs[:20]]
+    id_pairs += [(f'node-{node_from.node_id}', f'node-{node_to.node_id}')
+                 for node_from, node_to in pairs[:20]]
+    copy = _induced_copy((graph, other), graph.nodes | other.nodes)
+    _check_metrics('union_view', graph.union_view(other), copy, id_pairs,
+                   failures)
+
+
+def _check_subgraph_view(graph, generator, failures):
+    nodes = sorted(graph.nodes, key=lambda node: node.node_id)
+    nodes = generator.sample(nodes, len(nodes)//2)
+    inner = nodes[:len(nodes)//2]
+    id_pairs = [(generator.choice(inner).node_id,
+                 generator.choice(inner).node_id) for _ in range(50)]
+    view = graph.subgraph(nodes)
+    other = _relabelled(graph, generator)
+    for name, subgraph, members in (
+            ('subgraph_view', view, nodes),
+            ('nested_subgraph_view', view.subgraph(inner), inner),
+            ('union_subgraph_view', graph.union_view(other).subgraph(nodes),
+             nodes)):
+        _check_metrics(name, subgraph, _induced_copy((graph,), members),
+                       id_pairs, failures)
+
+    center = inner[0]
+    ego = graph.ego_network(center, k=2)
+    members = [node for node, distance
+               in _reference_distances(center).items() if distance <= 2]
+    if set(ego.nodes) != set(members):
+        failures.append(('ego_network', center.node_id, len(members),
+                         ego.order))
+    _check_metrics('ego_network', ego, _induced_copy((graph,), members),
+                   [(center.node_id, node.node_id) for node in members],
+                   failures)
+
+
+def run(number=8, size=120, pairs=200, seed=0):
+    generator = random.Random(seed)
+    results = dict()
+    for name, graph in _graphs(number, size, seed):
+        failures = list()
+        nodes = sorted(graph.nodes, key=lambda node: node.node_id)
+        sample = [(generator.choice(nodes), generator.choice(nodes))
+                  for _ in range(pairs)]
+        _check_distances(graph, sample, failures)
+        _check_clustering(graph, failures)
+        _check_diameter(graph, failures)
+        _check_save_load(graph, generator, failures)
+        _check_frozen(graph, sample, generator, failures)
+        _check_edge_list(graph, generator, failures)
+        _check_distance_cache(graph, sample, failures)
+        _check_union_view(graph, sample, generator, failures)
+        _check_subgraph_view(graph, generator, failures)
+        results[name] = failures
+    return results
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description='Compare graph_utils metrics with reference '
+                    'implementations on seeded random graphs.')
+    parser.add_argument('--graphs', type=int, default=8,
+                        help='number of random Erdős–Rényi graphs')
+    parser.add_argument('--size', type=int, default=120)
+    parser.add_argument('--pairs', type=int, default=200,
+                        help='distance queries checked per graph')
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args(arguments)
+
+    results = run(options.graphs, options.size, options.pairs, options.seed)
+    failed = False
+    for name, failures in results.items():
+        print(f'{name}: {"ok" if not failures else "FAILED"}')
+        for failure in failures[:10]:
+            print(f'  {failure}', file=sys.stderr)
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from graph_utils import Graph, Node  # noqa: E402
+
+
+def _graph(number_nodes, edges, is_directional=False):
+    graph = Graph(is_directional=is_directional)
+    graph.include_nodes([Node(node_id=node_id)
+                         for node_id in range(number_nodes)])
+    graph.edges_to_graph(edges)
+    return graph
+
+
+def erdos_renyi(number_nodes, averege_degree=4, seed=0,
+                is_directional=False):
+    generator = random.Random(seed)
+    number_edges = int(number_nodes*averege_degree/2)
+    edges = set()
+    while len(edges) < number_edges:
+        node_from = generator.randrange(number_nodes)
+        node_to = generator.randrange(number_nodes)
+        if node_from == node_to:
+            continue
+        if not is_directional and node_from > node_to:
+            node_from, node_to = node_to, node_from
+        edges.add((node_from, node_to))
+    return _graph(number_nodes, sorted(edges), is_directional)
+
+
+def barabasi_albert(number_nodes, attached=2, seed=0):
+    generator = random.Random(seed)
+    targets = list(range(attached))
+    repeated = list()
+    edges = list()
+    for node_from in range(attached, number_nodes):
+        for node_to in set(targets):
+            edges.append((node_from, node_to))
+        repeated.extend(targets)
+        repeated.extend([node_from]*attached)
+        targets = set()
+        while len(targets) < attached:
+            targets.add(generator.choice(repeated))
+        targets = list(targets)
+    return _graph(number_nodes, edges)
+
+
+def grid_2d(width, height=None, seed=0):
+    height = height if height else width
+    edges = list()
+    for line in range(height):
+        for column in range(width):
+            node = line*width + column
+            if column + 1 < width:
+                edges.append((node, node + 1))
+            if line + 1 < height:
+                edges.append((node, node + width))
+    return _graph(width*height, edges)
+
+
+def path(number_nodes, seed=0):
+    edges = [(node, node + 1) for node in range(number_nodes - 1)]
+    return _graph(number_nodes, edges)
+
+
+def star(number_nodes, seed=0):
+    edges = [(0, node) for node in range(1, number_nodes)]
+    return _graph(number_nodes, edges)
+
+
+GENERATORS = {
+    'erdos_renyi': erdos_renyi,
+    'barabasi_albert': barabasi_albert,
+    'grid_2d': lambda number_nodes, seed=0:
+        grid_2d(max(1, int(number_nodes**0.5)), seed=seed),
+    'path': path,
+    'star': star,
+}
@@ -0,0 +1,298 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generators import GENERATORS  # noqa: E402
+from graph_utils import Graph, Node  # noqa: E402
+
+
+def _sample_nodes(graph, number=20):
+    nodes = sorted(graph.nodes, key=lambda node: node.node_id)
+    step = max(1, len(nodes)//number)
+    return nodes[::step][:number]
+
+
+def _distances(graph):
+    nodes = _sample_nodes(graph)
+    for node_from, node_to in zip(nodes, reversed(nodes)):
+        graph.distance_between_not_weighted(node_from, node_to)
+
+
+def _weighted_distances(graph):
+    nodes = _sample_nodes(graph)
+    for node_from, node_to in zip(nodes, reversed(nodes)):
+        graph.distance_between_weighted(node_from, node_to)
+
+
+def _breadth_first_search(graph):
+    with redirect_stdout(io.StringIO()):
+        graph.breadth_first_search(_sample_nodes(graph, 1)[0])
+
+
+def _clustering_coefficient(graph):
+    for node in _sample_nodes(graph):
+        graph.clustering_coefficient(node)
+
+
+def _include_and_remove_nodes(graph):
+    nodes = [Node(node_id=('benchmark', position)) for position in range(100)]
+    graph.include_nodes(nodes)
+    graph.remove_nodes(nodes)
+
+
+def _add_and_remove_connections(graph):
+    nodes = _sample_nodes(graph)
+    existing = {id(connection) for node in nodes
+                for connection in node.connections}
+    for node_from, node_to in zip(nodes, reversed(nodes)):
+        graph.add_connection(node_from, node_to)
+    added = [connection for node in nodes for connection in node.connections
+             if id(connection) not in existing]
+    graph.remove_connections(added)
+
+
+def _include_and_remove_node(graph):
+    others = _sample_nodes(graph)
+    node = Node(node_id=('benchmark', 'node'))
+    graph.include_node(node)
+    graph.add_connections([(node, other, 1) for other in others])
+    graph.remove_node(node)
+
+
+def _add_connections_and_remove_connection(graph):
+    nodes = _sample_nodes(graph)
+    existing = {id(connection) for node in nodes
+                for connection in node.connections}
+    graph.add_connections([(node_from, node_to, 1) for node_from, node_to
+                           in zip(nodes, reversed(nodes))])
+    added = [connection for node in nodes for connection in node.connections
+             if id(connection) not in existing]
+    for connection in added:
+        graph.remove_connection(connection)
+
+
+def _weighted_distances_from(graph):
+    nodes = _sample_nodes(graph)
+    graph.weighted_distances(nodes[0], nodes)
+
+
+def _batch_weighted_distances(graph):
+    nodes = _sample_nodes(graph)
+    graph.batch_weighted_distances(zip(nodes, reversed(nodes)))
+
+
+def _get_node(graph):
+    for node in _sample_nodes(graph):
+        graph.get_node(node.node_id)
+
+
+def _edges(graph, directory):
+    return [(connection.node_from.node_id, connection.node_to.node_id,
+             connection.weight) for connection in graph.connections]
+
+
+def _edge_list_file(graph, directory):
+    path = os.path.join(directory, 'edges.txt')
+    with open(path, 'w') as file:
+        for node_from, node_to, _ in _edges(graph, directory):
+            file.write(f'{node_from} {node_to}\n')
+    return path
+
+
+def _adjacency(graph, directory):
+    adjacency = {node.node_id: dict() for node in graph.nodes}
+    for node_from, node_to, weight in _edges(graph, directory):
+        adjacency[node_from][node_to] = weight
+    return adjacency
+
+
+def _matrix(graph, directory):
+    nodes = sorted(graph.nodes, key=lambda node: node.node_id)
+    index = {node: position for position, node in enumerate(nodes)}
+    matrix = [[0]*len(nodes) for _ in nodes]
+    for connection in graph.connections:
+        matrix[index[connection.node_from]][index[connection.node_to]] = 1
+    return matrix
+
+
+def _saved_graph(graph, directory):
+    path = os.path.join(directory, 'graph.pygu')
+    graph.save(path)
+    return path
+
+
+def _uncached(metric):
+    def operation(graph):
+        graph._touch()
+        return metric(graph)
+    return operation
+
+
+OPERATIONS = {
+    'order': lambda graph: graph.order,
+    'size': lambda graph: graph.size,
+    'density': lambda graph: graph.density,
+    'averege_degree': lambda graph: graph.averege_degree,
+    'euler_walk': lambda graph: graph.euler_walk(),
+    'odd_degree_nodes': lambda graph: graph.odd_degree_nodes(),
+    'distance_between_not_weighted': _distances,
+    'distance_between_weighted': _weighted_distances,
+    'breadth_first_search': _breadth_first_search,
+    'clustering_coefficient': _clustering_coefficient,
+    'clustering_coefficients': lambda graph: graph.clustering_coefficients(),
+    'include_and_remove_nodes': _include_and_remove_nodes,
+    'add_and_remove_connections': _add_and_remove_connections,
+    'freeze': lambda graph: graph.freeze(),
+    'add': lambda graph: graph + graph,
+    'even_degree_nodes': lambda graph: graph.even_degree_nodes(),
+    'degree_histogram': lambda graph: graph.degree_histogram(),
+    'get_node': _get_node,
+    'clean_nodes': lambda graph: graph.clean_nodes(),
+    'include_and_remove_node': _include_and_remove_node,
+    'add_connections_and_remove_connection':
+        _add_connections_and_remove_connection,
+    'weighted_distances': _weighted_distances_from,
+    'batch_weighted_distances': _batch_weighted_distances,
+    'averege_clustering': lambda graph: graph.averege_clustering,
+    'triangles': lambda graph: graph.triangles(),
+    'triangle_count': lambda graph: graph.triangle_count,
+    'sample_distances':
+        lambda graph: graph.sample_distances(sample_size=20, seed=0),
+    'copy_connections': lambda graph: graph.copy_connections(
+        Graph(is_directional=graph.is_directional)),
+    'union_view': lambda graph: graph.union_view(Graph()),
+    'save': (lambda graph, directory: os.path.join(directory, 'save.pygu'),
+             lambda graph, path: graph.save(path)),
+    'load': (_saved_graph, lambda graph, path: Graph.load(path)),
+    'edges_to_graph': (_edges, lambda graph, edges: Graph().edges_to_graph(
+        edges, is_directional=True)),
+    'edge_list_to_graph': (_edge_list_file,
+                           lambda graph, path: Graph().edge_list_to_graph(
+                               path, is_directional=True)),
+    'adjacency_to_graph': (_adjacency,
+                           lambda graph, adjacency: Graph(
+                               is_directional=True).adjacency_to_graph(
+                                   adjacency)),
+}
+
+ALL_PAIRS_OPERATIONS = {
+    'diameter': _uncached(lambda graph: graph.diameter),
+    'averege_distance': _uncached(lambda graph: graph.averege_distance),
+    'all_distances': lambda graph: graph.all_distances(),
+    'extreme_nodes': _uncached(lambda graph: graph.extreme_nodes()),
+    'eccentricities': _uncached(lambda graph: graph.eccentricities()),
+    'distance_summary': _uncached(lambda graph: graph.distance_summary()),
+    'pruned_diameter': lambda graph: graph.pruned_diameter(),
+    'matrix_to_graph': (_matrix, lambda graph, matrix: Graph(
+        is_directional=True).matrix_to_graph(matrix, ordered=True)),
+}
+
+
+def _time(function, repeat):
+    timings = list()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sizes, repeat=3, seed=0, all_pairs_limit=1000, generators=None):
+    results = dict()
+    for name in generators if generators else GENERATORS:
+        generator = GENERATORS[name]
+        for size in sizes:
+            prefix = f'{name}-{size}'
+            results[f'{prefix}/construction'] = _time(
+                lambda: generator(size, seed=seed), repeat)
+            graph = generator(size, seed=seed)
+            operations = dict(OPERATIONS)
+            if graph.order <= all_pairs_limit:
+                operations.update(ALL_PAIRS_OPERATIONS)
+            with tempfile.TemporaryDirectory() as directory:
+                for operation_name, operation in operations.items():
+                    if isinstance(operation, tuple):
+                        setup, operation = operation
+                        prepared = setup(graph, directory)
+                        function = partial(operation, graph, prepared)
+                    else:
+                        function = partial(operation, graph)
+                    results[f'{prefix}/{operation_name}'] = _time(function,
+                                                                  repeat)
+    return results
+
+
+def compare(results, baseline, threshold, min_seconds=0.001):
+    regressions = dict()
+    for key, seconds in results.items():
+        previous = baseline.get(key)
+        if previous is None or previous < min_seconds:
+            continue
+        if seconds > previous*(1 + threshold):
+            regressions[key] = {'baseline': previous, 'current': seconds,
+                                'ratio': seconds/previous}
+    return regressions
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(
+        description='Time graph_utils operations on synthetic graphs.')
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[100, 1000, 5000])
+    parser.add_argument('--generators', nargs='+', choices=list(GENERATORS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--all-pairs-limit', type=int, default=1000,
+                        help='largest order that runs all-pairs metrics')
+    parser.add_argument('--output', help='write results as JSON here')
+    parser.add_argument('--baseline', help='JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown before failing (0.2 = 20%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.001,
+                        help='skip baseline timings shorter than this')
+    options = parser.parse_args(arguments)
+
+    results = run(options.sizes, options.repeat, options.seed,
+                  options.all_pairs_limit, options.generators)
+    report = {
+        'meta': {'python': platform.python_version(),
+                 'platform': platform.platform(),
+                 'sizes': options.sizes, 'repeat': options.repeat,
+                 'seed': options.seed},
+        'results': results,
+    }
+
+    regressions = dict()
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)['results']
+        regressions = compare(results, baseline, options.threshold,
+                              options.min_seconds)
+        report['regressions'] = regressions
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if options.output:
+        with open(options.output, 'w') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    for key, regression in sorted(regressions.items()):
+        print(f'REGRESSION {key}: {regression["baseline"]:.6f}s -> '
+              f'{regression["current"]:.6f}s ({regression["ratio"]:.2f}x)',
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,26 @@
+import asyncio
+import csv
+import gzip
+import heapq
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import ChainMap, OrderedDict, deque, namedtuple
+from collections.abc import Set
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial, wraps
+from itertools import count, repeat
+from math import sqrt
+from statistics import NormalDist, fmean, stdev
+
+
 class Error(Exception):
     """Base class for exceptions in this module."""
     pass
@@ -12,7 +35,7 @@ class NodeNotInGraphError(Error):
         elif len(nodes) == 1:
             standard_message = f'{nodes[0].node_id} Node is not in Graph'
         else:
-            nodes_to_message = [str(node.node_id) for node in self.nodes]
+            nodes_to_message = [str(node.node_id) for node in nodes]
             nodes_in_message = ', '.join(nodes_to_message)
             standard_message = f'{nodes_in_message} Nodes are not in Graph'
 
@@ -75,19 +98,18 @@ class GraphAlreadyHasNodes(Error):
 
 
 class Node:
-    created_nodes = set()
+    __slots__ = ('__node_id', 'state', 'weight', 'connections', 'incoming',
+                 'graph')
 
     def __init__(self, node_id=None, state: str = None,
                  connections: '{Connection}' = None, graph: 'Graph' = None,
                  weight: int = 1):
-        if node_id in Node.created_nodes:
-            raise NodeAlreadyExists(node=node_id)
-        self.__node_id = node_id if node_id else id(self)
+        self.__node_id = node_id if node_id is not None else id(self)
         self.state = state
         self.weight = weight
         self.connections = set(connections) if connections else set()
+        self.incoming = set()
         self.graph = graph
-        Node.created_nodes.add(self.__node_id)
 
     @property
     def node_id(self):
@@ -95,17 +117,17 @@ class Node:
 
     @node_id.setter
     def node_id(self, id):
-        if id in Node.created_nodes:
-            raise NodeAlreadyExists(node=id)
-        Node.created_nodes.add(id)
-        Node.created_nodes.remove(self.__node_id)
+        graph = self.graph
+        registered = graph is not None\
+            and graph.get_node(self.__node_id) is self
+        if registered:
+            if graph.get_node(id) is not None:
+                raise NodeAlreadyExists(node=id)
+            graph._forget_node(self)
         self.__node_id = id
-
-    @node_id.deleter
-    def node_id(self):
-        if self.__node_id in Node.created_nodes:
-            Node.created_nodes.remove(self.__node_id)
-        del self.__node_id
+        if registered:
+            graph._register_node(self)
+            graph._touch()
 
     @property
     def degree(self):
@@ -128,35 +150,25 @@ class Node:
         connections_ids = [str(connection.connection_id)
                            for connection in self.connections]
         connections = ', '.join(connections_ids)
-        graph_id = self.graph.graph_id
+        graph_id = self.graph.graph_id if self.graph else None
         return_text = f'Node(node_id={self.node_id}'
         return_text += f', state={self.state}'
         return_text += f', connections=set([{connections}])'
         return_text += f', graph={graph_id})'
         return return_text
 
-    def __del__(self):
-        for connection in self.connections:
-            self.graph.remove_connection(connection)
-        self.graph.remove_node(self)
-        del self.node_id
-        del self
-
 
 class Connection:
-    created_connections = set()
+    __slots__ = ('__connection_id', 'node_from', 'node_to', 'weight', 'graph')
 
     def __init__(self, connection_id=None,
                  node_from: Node = None, node_to: Node = None,
                  weight: int = 1, graph: 'Graph' = None):
-        if id in Connection.created_connections:
-            raise ConnectionAlreadyExists(connection=id)
         self.__connection_id = connection_id if connection_id else id(self)
         self.node_from = node_from
         self.node_to = node_to
         self.weight = weight
         self.graph = graph
-        Connection.created_connections.add(self.__connection_id)
 
     @property
     def connection_id(self):
@@ -164,17 +176,15 @@ class Connection:
 
     @connection_id.setter
     def connection_id(self, id):
-        if id in Connection.created_connections:
+        graph = self.graph
+        if graph is None or self not in graph.connections:
+            self.__connection_id = id
+            return
+        if Connection(connection_id=id) in graph.connections:
             raise ConnectionAlreadyExists(connection=id)
-        Connection.created_connections.add(id)
-        Connection.created_connections.remove(self.__connection_id)
+        graph._unlink(self)
         self.__connection_id = id
-
-    @connection_id.deleter
-    def connection_id(self):
-        if self.__connection_id in Connection.created_connections:
-            Connection.created_connections.remove(self.__connection_id)
-        del self.__connection_id
+        graph._link(self)
 
     def same(self, other):
         if isinstance(other, Connection):
@@ -206,44 +216,463 @@ class Connection:
         return_text += f' {self.node_to.node_id}'
         return return_text
 
-    def __del__(self):
-        self.graph.remove_connection(self)
-        del self.connection_id
-        del self
 
+def _coefficient(number_adjacent, number_connections, is_directional):
+    if is_directional:
+        max_connections = 2*(number_adjacent*(number_adjacent-1))/2
+    else:
+        max_connections = (number_adjacent*(number_adjacent-1))/2
+        number_connections /= 2
+
+    if number_adjacent == 0 or max_connections == 0:
+        coefficient = 0
+    else:
+        coefficient = number_connections/max_connections
+
+    return coefficient
+
+
+def _forward_triangles(neighbor_sets):
+    # Each triangle is found once, from its lowest ranked node, by
+    # intersecting the neighbors that rank above it (degree ordering).
+    ranked = sorted(range(len(neighbor_sets)),
+                    key=lambda node: len(neighbor_sets[node]))
+    rank = [0]*len(neighbor_sets)
+    for position, node in enumerate(ranked):
+        rank[node] = position
+    forward = [{neighbor for neighbor in neighbors
+                if rank[neighbor] > rank[node]}
+               for node, neighbors in enumerate(neighbor_sets)]
+
+    triangles = [0]*len(neighbor_sets)
+    for node, node_forward in enumerate(forward):
+        for neighbor in node_forward:
+            common = node_forward & forward[neighbor]
+            if common:
+                triangles[node] += len(common)
+                triangles[neighbor] += len(common)
+                for other in common:
+                    triangles[other] += 1
+    return triangles
+
+
+def _clustering_coefficients(adjacency, is_directional):
+    neighbor_sets = [set(neighbors) for neighbors in adjacency]
+    is_simple = all(len(neighbor_sets[node]) == len(neighbors)
+                    and node not in neighbor_sets[node]
+                    for node, neighbors in enumerate(adjacency))
+    is_symmetric = is_simple and all(node in neighbor_sets[neighbor]
+                                     for node, neighbors
+                                     in enumerate(neighbor_sets)
+                                     for neighbor in neighbors)
+
+    if is_symmetric:
+        triangles = _forward_triangles(neighbor_sets)
+        return [_coefficient(len(neighbors), 2*triangles[node], False)
+                for node, neighbors in enumerate(adjacency)]
+
+    coefficients = list()
+    for node, neighbors in enumerate(adjacency):
+        node_set = neighbor_sets[node]
+        number_connections = 0
+        for neighbor in neighbors:
+            if len(neighbor_sets[neighbor]) == len(adjacency[neighbor]):
+                number_connections += len(node_set & neighbor_sets[neighbor])
+            else:
+                number_connections += sum(1 for other in adjacency[neighbor]
+                                          if other in node_set)
+        coefficients.append(_coefficient(len(neighbors), number_connections,
+                                         is_directional))
+    return coefficients
+
+
+def _target_order(connection):
+    node_id = connection.node_to.node_id
+    return type(node_id).__name__, node_id
+
+
+def _expand_level(level, reached, other, connections_of, outgoing):
+    next_level = list()
+    meeting = None
+    shortest = None
+    for node in level:
+        depth = reached[node][0] + 1
+        for connection in connections_of(node):
+            neighbor = connection.node_to if outgoing else connection.node_from
+            if neighbor in reached:
+                continue
+            reached[neighbor] = (depth, node)
+            next_level.append(neighbor)
+            if neighbor in other and (shortest is None
+                                      or other[neighbor][0] < shortest):
+                shortest = other[neighbor][0]
+                meeting = neighbor
+    return next_level, meeting
+
+
+def _csr_distance_chunk(offsets, neighbors, sources, with_rows=False):
+    eccentricities = list()
+    distance_sum = 0
+    higher_distance = 0
+    extreme_nodes = None
+    rows = list() if with_rows else None
+    for source in sources:
+        row = [False]*(len(offsets) - 1) if with_rows else None
+        visited = {source}
+        frontier = [source]
+        distance = 0
+        farthest = source
+        while True:
+            next_frontier = list()
+            for position in frontier:
+                for neighbor in neighbors[offsets[position]:
+                                          offsets[position+1]]:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            distance += 1
+            distance_sum += distance*len(next_frontier)
+            farthest = next_frontier[-1]
+            frontier = next_frontier
+            if with_rows:
+                for position in frontier:
+                    row[position] = distance
+        eccentricities.append(distance)
+        if with_rows:
+            rows.append(row)
+        if distance > higher_distance:
+            higher_distance = distance
+            extreme_nodes = (source, farthest)
+    return eccentricities, distance_sum, higher_distance, extreme_nodes, rows
+
+
+_worker_csr = None
+
+
+def _init_csr_worker(offsets, neighbors):
+    global _worker_csr
+    _worker_csr = (offsets, neighbors)
+
+
+def _init_csr_worker_from_file(path):
+    global _worker_csr
+    _worker_csr = FrozenGraph.load(path)._csr()
+
+
+def _csr_worker_chunk(sources, with_rows=False):
+    offsets, neighbors = _worker_csr
+    return _csr_distance_chunk(offsets, neighbors, sources, with_rows)
+
+
+_worker_snapshot = None
+
+
+def _run_query(graph, name, args):
+    value = getattr(graph, name)
+    return value(*args) if callable(value) else value
+
+
+def _run_frozen_query(path, name, args):
+    global _worker_snapshot
+    if _worker_snapshot is None or _worker_snapshot[0] != path:
+        _worker_snapshot = (path, FrozenGraph.load(path))
+    return _run_query(_worker_snapshot[1], name, args)
+
+
+class ReadProgress:
+
+    def __init__(self):
+        self.lines = 0
+        self.edges = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0
 
-class Graph:
-    created_graphs = set()
+    @property
+    def edges_per_second(self):
+        if not self.elapsed:
+            return 0
+        return self.edges/self.elapsed
 
-    def __init__(self, graph_id=None, nodes: '{Node}' = None,
-                 connections: '{Connection}' = None,
-                 is_directional: 'bool' = False, is_weighted: 'bool' = False):
-        if id in Graph.created_graphs:
-            raise GraphAlreadyExists(graph=id)
-        self.__graph_id = graph_id if graph_id else id(self)
-        self.nodes = set(nodes) if nodes else set()
-        self.connections = set(connections) if connections else set()
-        self.is_directional = is_directional
-        self.is_weighted = is_weighted
-        Graph.created_graphs.add(self.__graph_id)
+    def __repr__(self):
+        return_text = f'ReadProgress(lines={self.lines}'
+        return_text += f', edges={self.edges}'
+        return_text += f', chunks={self.chunks}'
+        return_text += f', elapsed={self.elapsed:.3f}'
+        return_text += f', edges_per_second={self.edges_per_second:.0f})'
+        return return_text
 
-    @property
-    def graph_id(self):
-        return self.__graph_id
 
-    @graph_id.setter
-    def graph_id(self, id):
-        if id in Graph.created_graphs:
-            raise GraphAlreadyExists(graph=id)
-        Graph.created_graphs.add(id)
-        Graph.created_graphs.remove(self.__graph_id)
-        self.__graph_id = id
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def read_edge_list(source, delimiter=None, comments='#', source_column=0,
+                   target_column=1, weight_column=None, node_id=int,
+                   skip_header=False, chunk_size=100000, progress=None):
+    if isinstance(node_id, dict):
+        node_id = node_id.__getitem__
+    status = progress if isinstance(progress, ReadProgress)\
+        else ReadProgress()
+    callback = progress if callable(progress) else None
+
+    if isinstance(source, str):
+        opener = gzip.open if source.endswith('.gz') else open
+        file = opener(source, 'rt', newline='')
+    else:
+        file = source
+    try:
+        lines = file if delimiter is None\
+            else csv.reader(file, delimiter=delimiter)
+        chunk = list()
+        for line in lines:
+            status.lines += 1
+            if delimiter is None:
+                if comments and line.lstrip().startswith(comments):
+                    continue
+                line = line.split()
+            elif line and comments and line[0].lstrip().startswith(comments):
+                continue
+            if not line:
+                continue
+            if skip_header:
+                skip_header = False
+                continue
+            weight = 1 if weight_column is None\
+                else _number(line[weight_column])
+            chunk.append((node_id(line[source_column]),
+                          node_id(line[target_column]), weight))
+            if len(chunk) >= chunk_size:
+                status.edges += len(chunk)
+                status.chunks += 1
+                status.elapsed = time.perf_counter() - status.started
+                yield chunk
+                if callback:
+                    callback(status)
+                chunk = list()
+        if chunk:
+            status.edges += len(chunk)
+            status.chunks += 1
+            status.elapsed = time.perf_counter() - status.started
+            yield chunk
+            if callback:
+                callback(status)
+    finally:
+        if file is not source:
+            file.close()
+
+
+class Instrumentation:
+
+    def __init__(self, sink=None, samples=1000):
+        self.sink = sink
+        self.samples = samples
+        self.calls = dict()
+        self.traversals = dict()
+        self._lock = threading.Lock()
+
+    def record_call(self, name, seconds):
+        with self._lock:
+            calls = self.calls.get(name)
+            if calls is None:
+                calls = {'calls': 0, 'total': 0.0,
+                         'timings': deque(maxlen=self.samples)}
+                self.calls[name] = calls
+            calls['calls'] += 1
+            calls['total'] += seconds
+            calls['timings'].append(seconds)
+        if self.sink:
+            self.sink({'event': 'call', 'name': name, 'seconds': seconds})
+
+    def record_traversal(self, name, nodes_visited, edges_scanned):
+        with self._lock:
+            traversals = self.traversals.get(name)
+            if traversals is None:
+                traversals = {'traversals': 0, 'nodes_visited': 0,
+                              'edges_scanned': 0}
+                self.traversals[name] = traversals
+            traversals['traversals'] += 1
+            traversals['nodes_visited'] += nodes_visited
+            traversals['edges_scanned'] += edges_scanned
+        if self.sink:
+            self.sink({'event': 'traversal', 'name': name,
+                       'nodes_visited': nodes_visited,
+                       'edges_scanned': edges_scanned})
+
+    def snapshot(self):
+        with self._lock:
+            calls = {name: (values['calls'], values['total'],
+                            sorted(values['timings']))
+                     for name, values in self.calls.items()}
+            traversals = {name: dict(values)
+                          for name, values in self.traversals.items()}
+
+        methods = dict()
+        for name, (number_calls, total, timings) in calls.items():
+            methods[name] = {
+                'calls': number_calls,
+                'total': total,
+                'mean': total/number_calls,
+                'p50': _percentile(timings, 50),
+                'p90': _percentile(timings, 90),
+                'p99': _percentile(timings, 99),
+                'max': timings[-1],
+            }
+        return {'methods': methods, 'traversals': traversals}
+
+
+def _percentile(ordered, percent):
+    position = max(0, -(-len(ordered)*percent//100) - 1)
+    return ordered[position]
+
+
+def _instrumented(function):
+    name = function.__name__
+
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = self._instrumentation
+        if instrumentation is None:
+            return function(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            instrumentation.record_call(name,
+                                        time.perf_counter() - started)
+    return wrapper
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize',
+                                     'currsize'])
+
+
+class DistanceCache:
+    missing = object()
+
+    def __init__(self, maxsize=1024, trees=64):
+        self.maxsize = maxsize
+        self.trees_maxsize = trees
+        self.version = None
+        self.distances = OrderedDict()
+        self.trees = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.tree_hits = 0
+        self.tree_misses = 0
+        self._lock = threading.Lock()
+
+    def distance(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            distance = self.distances.get(key, self.missing)
+            if distance is self.missing:
+                self.misses += 1
+            else:
+                self.distances.move_to_end(key)
+                self.hits += 1
+            return distance
+
+    def store_distance(self, key, distance, version):
+        with self._lock:
+            self._check_version(version)
+            self._store(self.distances, key, distance, self.maxsize)
+
+    def tree(self, key, version, count=True):
+        with self._lock:
+            self._check_version(version)
+            tree = self.trees.get(key)
+            if tree is not None:
+                self.trees.move_to_end(key)
+            if count:
+                if tree is None:
+                    self.tree_misses += 1
+                else:
+                    self.tree_hits += 1
+            return tree
+
+    def store_tree(self, key, tree, version):
+        with self._lock:
+            self._check_version(version)
+            self._store(self.trees, key, tree, self.trees_maxsize)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self.distances))
+
+    def tree_info(self):
+        return CacheInfo(self.tree_hits, self.tree_misses,
+                         self.trees_maxsize, len(self.trees))
+
+    def clear(self):
+        with self._lock:
+            self.distances.clear()
+            self.trees.clear()
+
+    def _check_version(self, version):
+        if self.version != version:
+            self.distances.clear()
+            self.trees.clear()
+            self.version = version
+
+    @staticmethod
+    def _store(entries, key, value, maxsize):
+        if maxsize is not None and maxsize <= 0:
+            return
+        entries[key] = value
+        entries.move_to_end(key)
+        if maxsize is not None and len(entries) > maxsize:
+            entries.popitem(last=False)
+
+
+class DistanceSummary:
+
+    def __init__(self, eccentricities=None, distance_sum=0, diameter=None,
+                 extreme_nodes=None, version=None):
+        self.eccentricities = eccentricities if eccentricities else dict()
+        self.distance_sum = distance_sum
+        self.diameter = diameter
+        self.extreme_nodes = extreme_nodes
+        self.version = version
 
-    @graph_id.deleter
-    def graph_id(self):
-        if self.__graph_id in Graph.created_graphs:
-            Graph.created_graphs.remove(self.__graph_id)
-        del self.__graph_id
+    def __repr__(self):
+        return_text = f'DistanceSummary(diameter={self.diameter}'
+        return_text += f', distance_sum={self.distance_sum}'
+        return_text += f', nodes={len(self.eccentricities)})'
+        return return_text
+
+
+class DistanceEstimate:
+
+    def __init__(self, averege_distance=None, confidence_interval=None,
+                 confidence=0.95, distribution=None, unreachable=0,
+                 sample_size=0):
+        self.averege_distance = averege_distance
+        self.confidence_interval = confidence_interval
+        self.confidence = confidence
+        self.distribution = distribution if distribution else dict()
+        self.unreachable = unreachable
+        self.sample_size = sample_size
+
+    def __repr__(self):
+        return_text = f'DistanceEstimate(averege_distance='
+        return_text += f'{self.averege_distance}'
+        return_text += f', confidence_interval={self.confidence_interval}'
+        return_text += f', confidence={self.confidence}'
+        return_text += f', sample_size={self.sample_size})'
+        return return_text
+
+
+class _ReadOnlyGraph:
+
+    _instrumentation = None
+    _distance_cache = None
+    _workers = None
 
     @property
     def order(self):
@@ -256,27 +685,12 @@ class Graph:
         return len(self.connections)/2
 
     @property
-    def averege_degree(self):
-        connections_per_node = [node.degree for node in self.nodes]
-        sum_degrees = sum(connections_per_node)
-        averege = sum_degrees/self.order
-        return averege
-
-    @property
+    @_instrumented
     def diameter(self):
-        higher_distance = None
-        for node_from in self.nodes:
-            for node_to in self.nodes:
-                distance = self.distance_between_not_weighted(node_from,
-                                                              node_to)
-                if higher_distance:
-                    if distance > higher_distance:
-                        higher_distance = distance
-                else:
-                    higher_distance = distance
-        return higher_distance
+        return self.distance_summary().diameter
 
     @property
+    @_instrumented
     def density(self):
         number_nodes = self.order
         number_connections = self.size
@@ -285,243 +699,1065 @@ class Graph:
         return 2*(number_connections)/(number_nodes*(number_nodes-1))
 
     @property
+    @_instrumented
     def averege_distance(self):
         number_nodes = len(self.nodes)
         not_ordered_pairs = (number_nodes*(number_nodes-1))/2
-        sum_distance = sum(self.all_distances())/2
+        sum_distance = self.distance_summary().distance_sum/2
         averege_distance = sum_distance/not_ordered_pairs
         return averege_distance
 
-    def all_distances(self):
+    @_instrumented
+    def all_distances(self, workers=None):
+        workers = self._workers if workers is None else workers
         distances = list()
-        for node_from in self.nodes:
-            for node_to in self.nodes:
-                distance = self.distance_between_not_weighted(node_from,
-                                                              node_to)
-                distances.append(distance)
-
+        if workers and workers > 1:
+            summary = self._parallel_all_pairs(workers, distances)
+        else:
+            summary = self._all_pairs(distances)
+        self._distance_summary = summary
         return distances
 
+    @_instrumented
     def extreme_nodes(self):
-        higher_distance = None
+        return self.distance_summary().extreme_nodes
+
+    @_instrumented
+    def eccentricities(self):
+        return dict(self.distance_summary().eccentricities)
+
+    @_instrumented
+    def distance_summary(self, workers=None):
+        workers = self._workers if workers is None else workers
+        summary = self._distance_summary
+        if summary is None or summary.version != self._version:
+            if workers and workers > 1:
+                summary = self._parallel_all_pairs(workers)
+            else:
+                summary = self._all_pairs()
+            self._distance_summary = summary
+        return summary
+
+    def _parallel_all_pairs(self, workers, distances=None):
+        frozen_summary = self.freeze()._all_pairs(workers, distances)
+        node_ids = self._node_ids
+        eccentricities = {node_ids[node_id]: eccentricity
+                          for node_id, eccentricity
+                          in frozen_summary.eccentricities.items()}
+        nodes = frozen_summary.extreme_nodes
+        if nodes is not None:
+            nodes = (node_ids[nodes[0]], node_ids[nodes[1]])
+        return DistanceSummary(eccentricities, frozen_summary.distance_sum,
+                               frozen_summary.diameter, nodes,
+                               version=self._version)
+
+    def _all_pairs(self, distances=None):
+        eccentricities = dict()
+        distance_sum = 0
+        higher_distance = 0
         nodes = None
         for node_from in self.nodes:
-            for node_to in self.nodes:
-                distance = self.distance_between_not_weighted(node_from,
-                                                              node_to)
-                if higher_distance:
-                    if distance > higher_distance:
-                        higher_distance = distance
-                        nodes = (node_from, node_to)
-                else:
-                    higher_distance = distance
-                    nodes = (node_from, node_to)
-        return nodes
-
-    def even_degree_nodes(self):
-        nodes = set()
+            reached = self._distances_from(node_from)
+            farthest = next(reversed(reached))
+            eccentricity = reached[farthest]
+            eccentricities[node_from] = eccentricity
+            distance_sum += sum(reached.values())
+            if eccentricity > higher_distance:
+                higher_distance = eccentricity
+                nodes = (node_from, farthest)
+            if distances is not None:
+                distances.extend(False if node_to is node_from
+                                 else reached.get(node_to, False)
+                                 for node_to in self.nodes)
+
+        if higher_distance:
+            diameter = higher_distance
+        else:
+            diameter = False if self.nodes else None
+        return DistanceSummary(eccentricities, distance_sum, diameter, nodes,
+                               version=self._version)
+
+    @_instrumented
+    def pruned_diameter(self):
+        if not self._is_symmetric():
+            return self.diameter
+
+        higher_distance = 0
+        visited = set()
+        for start in self.nodes:
+            if start in visited:
+                continue
+            component = self._distances_from(start)
+            visited.update(component)
+            if len(component) > 1:
+                higher_distance = max(higher_distance,
+                                      self._component_diameter(component))
+
+        if higher_distance:
+            return higher_distance
+        return False if self.nodes else None
+
+    def _component_diameter(self, component):
+        # Four sweeps for a lower bound and a central root: each pair of
+        # sweeps runs between the ends of a long shortest path, and the root
+        # is the node whose farthest sweep end is nearest, i.e. the midpoint
+        # of those paths. iFUB then walks the root's BFS levels from the
+        # outside in, stopping once no deeper pair can beat the bound.
+        sweeps = list()
+        farthest = next(reversed(component))
+        for _ in range(2):
+            sweeps.append(self._distances_from(farthest))
+            sweeps.append(self._distances_from(next(reversed(sweeps[-1]))))
+            center = min(component, key=lambda node: max(
+                sweep[node] for sweep in sweeps))
+            distances = self._distances_from(center)
+            farthest = next(reversed(distances))
+        lower_bound = max(max(sweep.values()) for sweep in sweeps)
+        levels = dict()
+        for node, distance in distances.items():
+            levels.setdefault(distance, []).append(node)
+
+        level = max(levels)
+        lower_bound = max(lower_bound, level)
+        upper_bound = 2*level
+        while upper_bound > lower_bound:
+            level_eccentricity = max(max(self._distances_from(node).values())
+                                     for node in levels[level])
+            lower_bound = max(lower_bound, level_eccentricity)
+            if lower_bound > 2*(level-1):
+                return lower_bound
+            upper_bound = 2*(level-1)
+            level -= 1
+        return lower_bound
+
+    def _is_symmetric(self):
         for node in self.nodes:
-            degree = node.degree
-            if degree % 2 == 0:
-                node.add(nodes)
-        return nodes
+            outgoing = {connection.node_to
+                        for connection in self._connections_of(node)}
+            incoming = {connection.node_from
+                        for connection in self._incoming_of(node)}
+            if outgoing != incoming:
+                return False
+        return True
 
-    def odd_degree_nodes(self):
-        nodes = set()
-        for node in self.nodes:
-            degree = node.degree
-            if degree % 2 != 0:
-                nodes.add(node)
-        return nodes
+    @_instrumented
+    def sample_distances(self, sample_size=100, confidence=0.95, seed=None):
+        number_nodes = self.order
+        if number_nodes < 2:
+            message = 'distance sampling needs at least two nodes'
+            raise ValueError(message)
+
+        sample_size = min(sample_size, number_nodes)
+        sources = random.Random(seed).sample(list(self.nodes), sample_size)
+        means = list()
+        counts = dict()
+        unreachable = 0
+        for source in sources:
+            reached = self._distances_from(source)
+            means.append(sum(reached.values())/(number_nodes-1))
+            unreachable += number_nodes - len(reached)
+            for distance in reached.values():
+                if distance:
+                    counts[distance] = counts.get(distance, 0) + 1
+
+        averege_distance = fmean(means)
+        margin = 0
+        if sample_size > 1:
+            z = NormalDist().inv_cdf(0.5 + confidence/2)
+            correction = sqrt((number_nodes-sample_size)/(number_nodes-1))
+            margin = z*stdev(means)/sqrt(sample_size)*correction
+        interval = (averege_distance - margin, averege_distance + margin)
+
+        pairs = sample_size*(number_nodes-1)
+        distribution = {distance: counts[distance]/pairs
+                        for distance in sorted(counts)}
+        return DistanceEstimate(averege_distance, interval, confidence,
+                                distribution, unreachable/pairs, sample_size)
+
+    def _distances_from(self, source):
+        cache = self._distance_cache
+        if cache is not None:
+            distances = cache.tree(source.node_id, self._version)
+            if distances is not None:
+                return distances
+        distances = {source: 0}
+        to_check = deque([source])
+        scanned = 0
+        connections_of = self._connections_of
+        while to_check:
+            node = to_check.popleft()
+            distance = distances[node] + 1
+            connections = connections_of(node)
+            scanned += len(connections)
+            for connection in connections:
+                node_to = connection.node_to
+                if node_to not in distances:
+                    distances[node_to] = distance
+                    to_check.append(node_to)
+        self._traversed('single_source_bfs', len(distances), scanned)
+        if cache is not None:
+            cache.store_tree(source.node_id, distances, self._version)
+        return distances
 
-    def euler_walk(self):
-        if len(self.odd_degree_nodes()) > 2:
-            return False
-        return True
+    def _traversed(self, name, nodes_visited, edges_scanned):
+        if self._instrumentation is not None:
+            self._instrumentation.record_traversal(name, nodes_visited,
+                                                   edges_scanned)
 
-    def distance_between_not_weighted(self, node_1, node_2):
-        self.clean_nodes('white')
-        node_1.state = 'gray'
-        nodes_not_in_graph = {node_1, node_2}.difference(self.nodes)
+    @_instrumented
+    def distance_between_not_weighted(self, node_1, node_2, path=False):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_1, node_2))
         if len(nodes_not_in_graph) > 0:
             raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
                                       graph=self.graph_id)
-        to_check = [(node_1, 0)]
-        distance = [0]*len(self.nodes)
-        node_index = 0
-        while len(to_check) > 0:
-            node = to_check[0]
-            to_check.pop(0)
-            connections = node[0].connections
+        cache = self._distance_cache
+        if cache is None or path:
+            return self._distance_not_weighted(node_1, node_2, path)
+        key = (node_1.node_id, node_2.node_id)
+        distance = cache.distance(key, self._version)
+        if distance is not cache.missing:
+            return distance
+        distances = cache.tree(node_1.node_id, self._version, count=False)
+        if distances is not None:
+            distance = False if node_1 is node_2\
+                else distances.get(node_2, False)
+        else:
+            distance = self._distance_not_weighted(node_1, node_2)
+        cache.store_distance(key, distance, self._version)
+        return distance
+
+    def _distance_not_weighted(self, node_1, node_2, path=False):
+        if node_1 is node_2 or not self._same_component(node_1, node_2):
+            return (False, []) if path else False
+        forward = {node_1: (0, None)}
+        backward = {node_2: (0, None)}
+        forward_level = [node_1]
+        backward_level = [node_2]
+        scanned = 0
+        meeting = None
+        while forward_level and backward_level and meeting is None:
+            forward_cost = sum(len(self._connections_of(node))
+                               for node in forward_level)
+            backward_cost = sum(len(self._incoming_of(node))
+                                for node in backward_level)
+            if forward_cost <= backward_cost:
+                scanned += forward_cost
+                forward_level, meeting = _expand_level(
+                    forward_level, forward, backward, self._connections_of,
+                    True)
+            else:
+                scanned += backward_cost
+                backward_level, meeting = _expand_level(
+                    backward_level, backward, forward, self._incoming_of,
+                    False)
+
+        self._traversed('distance_between_not_weighted',
+                        len(forward) + len(backward), scanned)
+        if meeting is None:
+            return (False, []) if path else False
+        distance = forward[meeting][0] + backward[meeting][0]
+        if not path:
+            return distance
+        nodes = list()
+        node = meeting
+        while node is not None:
+            nodes.append(node)
+            node = forward[node][1]
+        nodes.reverse()
+        node = backward[meeting][1]
+        while node is not None:
+            nodes.append(node)
+            node = backward[node][1]
+        return distance, nodes
+
+    @_instrumented
+    def distances_not_weighted(self, source, targets=None):
+        if targets is not None:
+            targets = [targets] if isinstance(targets, Node)\
+                else list(targets)
+        nodes_not_in_graph = self._nodes_not_in_graph(
+            [source] + (targets if targets else []))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=nodes_not_in_graph,
+                                      graph=self.graph_id)
+
+        distances = {source: 0}
+        if targets is None:
+            pending = None
+        else:
+            pending = set(targets)
+            pending.discard(source)
+        to_check = deque([source])
+        scanned = 0
+        connections_of = self._connections_of
+        while to_check and (pending is None or pending):
+            node = to_check.popleft()
+            distance = distances[node] + 1
+            connections = connections_of(node)
+            scanned += len(connections)
             for connection in connections:
-                if connection.node_to.state == 'white':
-                    connection.node_to.state = 'gray'
-                    node_index += 1
-                    distance[node_index] = distance[node[1]] + 1
-                    if connection.node_to == node_2:
-                        self.clean_nodes()
-                        return distance[node_index]
-                    to_check.append((connection.node_to, node_index))
-            node[0].state = 'black'
-
-        self.clean_nodes()
-        return False
+                node_to = connection.node_to
+                if node_to not in distances:
+                    distances[node_to] = distance
+                    to_check.append(node_to)
+                    if pending is not None:
+                        pending.discard(node_to)
+
+        self._traversed('distances_not_weighted', len(distances), scanned)
+        if targets is not None:
+            distances = {node: distances[node] for node in targets
+                         if node in distances}
+        return distances
 
-    def breadth_first_search(self, node_from):
-        self.clean_nodes('white')
-        node_from.state = 'gray'
-        nodes_not_in_graph = {node_from}.difference(self.nodes)
+    @_instrumented
+    def breadth_first_search(self, node_from, verbose=False):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_from,))
         if len(nodes_not_in_graph) > 0:
             raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
                                       graph=self.graph_id)
-        to_check = [(node_from, 0)]
-        distance = [0]*len(self.nodes)
-        node_index = 0
-        while len(to_check) > 0:
-            node = to_check[0]
-            to_check.pop(0)
-            unordered_connections = node[0].connections
-            connections = sorted(unordered_connections,
-                                 key=lambda x: (x.node_to.node_id))
+        visited = {node_from}
+        to_check = deque([node_from])
+        scanned = 0
+        while to_check:
+            node = to_check.popleft()
+            connections = self._adjacency(node)
+            scanned += len(connections)
             for connection in connections:
-                if connection.node_to.state == 'white':
-                    print(connection)
-                    connection.node_to.state = 'gray'
-                    node_index += 1
-                    distance[node_index] = distance[node[1]] + 1
-                    to_check.append((connection.node_to, node_index))
-            node[0].state = 'black'
-
-        self.clean_nodes()
+                if connection.node_to not in visited:
+                    if verbose:
+                        print(connection)
+                    visited.add(connection.node_to)
+                    to_check.append(connection.node_to)
+
+        self._traversed('breadth_first_search', len(visited), scanned)
         return True
 
+    def bfs(self, node_from, max_depth=None):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_from,))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph_id)
+        return self._bfs(node_from, max_depth)
+
+    def _bfs(self, node_from, max_depth):
+        visited = {node_from}
+        to_check = deque([(node_from, 0)])
+        scanned = 0
+        try:
+            yield node_from, 0, None
+            while to_check:
+                node, depth = to_check.popleft()
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                connections = self._adjacency(node)
+                scanned += len(connections)
+                for connection in connections:
+                    node_to = connection.node_to
+                    if node_to not in visited:
+                        visited.add(node_to)
+                        to_check.append((node_to, depth + 1))
+                        yield node_to, depth + 1, node
+        finally:
+            self._traversed('bfs', len(visited), scanned)
+
+    def dfs(self, node_from, max_depth=None):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_from,))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph_id)
+        return self._dfs(node_from, max_depth)
+
+    def _dfs(self, node_from, max_depth):
+        visited = {node_from}
+        scanned = 0
+        try:
+            yield node_from, 0, None
+            if max_depth is not None and max_depth <= 0:
+                return
+            connections = self._adjacency(node_from)
+            scanned += len(connections)
+            stack = [(node_from, iter(connections))]
+            while stack:
+                node, connections = stack[-1]
+                for connection in connections:
+                    node_to = connection.node_to
+                    if node_to not in visited:
+                        break
+                else:
+                    stack.pop()
+                    continue
+                visited.add(node_to)
+                depth = len(stack)
+                yield node_to, depth, node
+                if max_depth is None or depth < max_depth:
+                    connections = self._adjacency(node_to)
+                    scanned += len(connections)
+                    stack.append((node_to, iter(connections)))
+        finally:
+            self._traversed('dfs', len(visited), scanned)
+
+    def _connections_of(self, node):
+        return node.connections
+
+    def _incoming_of(self, node):
+        return node.incoming
+
+    def _adjacency(self, node):
+        if self._adjacency_version != self._version:
+            self._adjacency_cache = dict()
+            self._adjacency_version = self._version
+        connections = self._adjacency_cache.get(node)
+        if connections is None:
+            connections = tuple(sorted(self._connections_of(node),
+                                       key=lambda x: (x.node_to.node_id)))
+            self._adjacency_cache[node] = connections
+        return connections
+
+    @_instrumented
+    def distance_between_weighted(self, node_1, node_2, path=False):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_1, node_2))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph_id)
+        if not self._same_component(node_1, node_2):
+            return (False, []) if path else False
+        distances, previous = self._dijkstra((node_1,), (node_2,))
+        distance = distances.get(node_2, False)
+        if not path:
+            return distance
+        if node_2 not in distances:
+            return distance, []
+        return distance, self._path_to(node_2, previous)
+
+    @_instrumented
+    def weighted_distances(self, sources, targets=None, paths=False):
+        sources = [sources] if isinstance(sources, Node) else list(sources)
+        if targets is not None:
+            targets = [targets] if isinstance(targets, Node)\
+                else list(targets)
+        nodes_not_in_graph = self._nodes_not_in_graph(
+            sources + (targets if targets else []))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=nodes_not_in_graph,
+                                      graph=self.graph_id)
+
+        distances, previous = self._dijkstra(sources, targets)
+        if targets is not None:
+            distances = {node: distances[node] for node in targets
+                         if node in distances}
+        if not paths:
+            return distances
+        node_paths = {node: self._path_to(node, previous)
+                      for node in distances}
+        return distances, node_paths
+
+    @_instrumented
+    def batch_weighted_distances(self, pairs):
+        targets_by_source = dict()
+        for node_1, node_2 in pairs:
+            targets_by_source.setdefault(node_1, []).append(node_2)
+
+        distances = dict()
+        for source, targets in targets_by_source.items():
+            reached = self.weighted_distances(source, targets)
+            for target in targets:
+                distances[(source, target)] = reached.get(target, False)
+        return distances
+
+    def _dijkstra(self, sources, targets=None):
+        distances = dict()
+        previous = dict()
+        best = dict()
+        counter = count()
+        to_check = list()
+        for source in sources:
+            best[source] = 0
+            to_check.append((0, next(counter), source))
+        pending = set(targets) if targets is not None else None
+        scanned = 0
+        connections_of = self._connections_of
+
+        while to_check:
+            distance, _, node = heapq.heappop(to_check)
+            if node in distances:
+                continue
+            distances[node] = distance
+            if pending is not None:
+                pending.discard(node)
+                if not pending:
+                    break
+            connections = connections_of(node)
+            scanned += len(connections)
+            for connection in connections:
+                node_to = connection.node_to
+                if node_to in distances:
+                    continue
+                if connection.weight < 0:
+                    message = f'negative weight in connection {connection}'
+                    raise ValueError(message)
+                new_distance = distance + connection.weight
+                if node_to not in best or new_distance < best[node_to]:
+                    best[node_to] = new_distance
+                    previous[node_to] = node
+                    heapq.heappush(to_check,
+                                   (new_distance, next(counter), node_to))
+
+        self._traversed('dijkstra', len(distances), scanned)
+        return distances, previous
+
+    @staticmethod
+    def _path_to(node, previous):
+        path = [node]
+        while node in previous:
+            node = previous[node]
+            path.append(node)
+        path.reverse()
+        return path
+
+    @_instrumented
     def clustering_coefficient(self, node):
-        node_connections = node.connections
+        node_connections = self._connections_of(node)
         adjacent_nodes = [connection.node_to
                           for connection in node_connections]
-        number_adjacent = len(adjacent_nodes)
+        adjacent_set = set(adjacent_nodes)
         number_connections = 0
         for node in adjacent_nodes:
-            for connection in node.connections:
-                if connection.node_to in adjacent_nodes:
+            for connection in self._connections_of(node):
+                if connection.node_to in adjacent_set:
                     number_connections += 1
 
-        if self.is_directional:
-            max_connections = 2*(number_adjacent*(number_adjacent-1))/2
-        else:
-            max_connections = (number_adjacent*(number_adjacent-1))/2
-            number_connections /= 2
+        return _coefficient(len(adjacent_nodes), number_connections,
+                            self.is_directional)
 
-        if number_adjacent == 0 or max_connections == 0:
-            coefficient = 0
-        else:
-            coefficient = number_connections/max_connections
+    @_instrumented
+    def clustering_coefficients(self):
+        nodes = list(self.nodes)
+        index = {node: position for position, node in enumerate(nodes)}
+        adjacency = [[index[connection.node_to]
+                      for connection in self._connections_of(node)]
+                     for node in nodes]
+        coefficients = _clustering_coefficients(adjacency,
+                                                self.is_directional)
+        return dict(zip(nodes, coefficients))
 
-        return coefficient
+    @property
+    @_instrumented
+    def averege_clustering(self):
+        coefficients = self.clustering_coefficients()
+        return sum(coefficients.values())/self.order
+
+    @_instrumented
+    def triangles(self):
+        nodes = list(self.nodes)
+        index = {node: position for position, node in enumerate(nodes)}
+        neighbor_sets = [set() for node in nodes]
+        for connection in self.connections:
+            node_from = index[connection.node_from]
+            node_to = index[connection.node_to]
+            if node_from != node_to:
+                neighbor_sets[node_from].add(node_to)
+                neighbor_sets[node_to].add(node_from)
+        return dict(zip(nodes, _forward_triangles(neighbor_sets)))
+
+    @property
+    @_instrumented
+    def triangle_count(self):
+        return sum(self.triangles().values())//3
+
+    @_instrumented
+    def freeze(self):
+        nodes = list(self.nodes)
+        index = {node: position for position, node in enumerate(nodes)}
+        offsets = array('q', [0])
+        neighbors = array('q')
+        weights = array('d')
+        for node in nodes:
+            for connection in sorted(self._connections_of(node),
+                                     key=_target_order):
+                neighbors.append(index[connection.node_to])
+                weights.append(connection.weight)
+            offsets.append(len(neighbors))
+
+        node_ids = [node.node_id for node in nodes]
+        return FrozenGraph(node_ids, offsets, neighbors, weights,
+                           is_directional=self.is_directional,
+                           is_weighted=self.is_weighted,
+                           graph_id=self.graph_id)
+
+    def _nodes_not_in_graph(self, nodes):
+        node_ids = self._node_ids
+        nodes_not_in_graph = {id(node): node for node in nodes
+                              if node_ids.get(node.node_id) is not node}
+        return list(nodes_not_in_graph.values())
+
+    def subgraph(self, nodes):
+        return SubgraphView(self, nodes)
+
+    def ego_network(self, node, k=1):
+        return self.subgraph(reached for reached, _, _
+                             in self.bfs(node, max_depth=k))
+
+    def __str__(self):
+        connections = tuple([(connection.node_from.node_id,
+                              connection.node_to.node_id,)
+                             for connection in self.connections])
+        nodes = tuple([node.node_id for node in self.nodes])
+
+        return_text = f"G(V{nodes}, E{connections})"
+        return return_text
+
+
+class Graph(_ReadOnlyGraph):
+
+    def __init__(self, graph_id=None, nodes: '{Node}' = None,
+                 connections: '{Connection}' = None,
+                 is_directional: 'bool' = False, is_weighted: 'bool' = False):
+        self.__graph_id = graph_id if graph_id else id(self)
+        self.nodes = set()
+        self.connections = set(connections) if connections else set()
+        self.is_directional = is_directional
+        self.is_weighted = is_weighted
+        self._node_ids = dict()
+        self._degree_sum = 0
+        self._degree_histogram = dict()
+        self._odd_nodes = set()
+        self._even_nodes = set()
+        self._component_maps = (dict(), dict())
+        self._components_stale = False
+        self._components_lock = threading.Lock()
+        self._version = 0
+        self._distance_summary = None
+        self._adjacency_cache = dict()
+        self._adjacency_version = 0
+        self._distance_cache = None
+        self._workers = None
+        self._instrumentation = None
+        if nodes:
+            self.include_nodes(nodes)
+
+    @property
+    def graph_id(self):
+        return self.__graph_id
+
+    @graph_id.setter
+    def graph_id(self, id):
+        self.__graph_id = id
+
+    @property
+    def averege_degree(self):
+        averege = self._degree_sum/self.order
+        return averege
+
+    def enable_instrumentation(self, sink=None, samples=1000):
+        self._instrumentation = Instrumentation(sink=sink, samples=samples)
+        return self._instrumentation
+
+    def disable_instrumentation(self):
+        self._instrumentation = None
+
+    def enable_distance_cache(self, maxsize=1024, trees=64):
+        self._distance_cache = DistanceCache(maxsize=maxsize, trees=trees)
+        return self._distance_cache
+
+    def disable_distance_cache(self):
+        self._distance_cache = None
+
+    def enable_parallel(self, workers=None):
+        self._workers = workers if workers else os.cpu_count()
+
+    def disable_parallel(self):
+        self._workers = None
+
+    def distance_cache_info(self):
+        cache = self._distance_cache
+        if cache is None:
+            return None
+        return {'distances': cache.info(), 'trees': cache.tree_info()}
+
+    def stats(self):
+        if self._instrumentation is None:
+            return dict()
+        return self._instrumentation.snapshot()
+
+    def even_degree_nodes(self):
+        return set(self._even_nodes)
+
+    def odd_degree_nodes(self):
+        return set(self._odd_nodes)
+
+    def degree_histogram(self):
+        return dict(self._degree_histogram)
+
+    def euler_walk(self):
+        if len(self._odd_nodes) > 2:
+            return False
+        return True
+
+    @_instrumented
+    def save(self, path):
+        return self.freeze().save(path)
+
+    @staticmethod
+    def load(path):
+        return FrozenGraph.load(path).thaw()
+
+    def _touch(self):
+        self._version += 1
 
     def clean_nodes(self, state_value=None):
         for node in self.nodes:
             node.state = state_value
 
     def remove_node(self, node):
-        self.nodes.remove(node)
-        node.graph = None
-        connections_with_node = {connection for connection in self.connections
-                                 if connection.node_from == node
-                                 or connection.node_to == node}
-        nodes_with_connection = {connection.node_from
-                                 for connection in self.connections
-                                 if connection.node_from == node
-                                 or connection.node_to == node}
-        new_connections = self.connections.difference(connections_with_node)
-        self.connections = new_connections
-        for node in nodes_with_connection:
-            new_node_connections = node.connections\
-                                   .difference(connections_with_node)
-            node.connections = new_node_connections
+        self.remove_nodes([node])
+
+    @_instrumented
+    def remove_nodes(self, nodes):
+        nodes = nodes if isinstance(nodes, list) else list(nodes)
+        nodes_not_in_graph = self._nodes_not_in_graph(nodes)
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=nodes_not_in_graph,
+                                      graph=self.graph_id)
+        nodes = list(dict.fromkeys(nodes))
+
+        connections_with_node = dict()
+        for node in nodes:
+            for connection in node.connections:
+                connections_with_node[id(connection)] = connection
+            for connection in node.incoming:
+                connections_with_node[id(connection)] = connection
+        for connection in connections_with_node.values():
+            self._unlink(connection)
+        for node in nodes:
+            self._forget_node(node)
+            node.graph = None
+        self._touch()
 
     def include_node(self, node):
-        if node.graph and (node.graph != self):
-            raise NodeAlreadyInAGraph(node=node)
-        self.nodes.add(node)
-        node.graph = self
+        self.include_nodes([node])
 
     def remove_connection(self, connection):
-        if connection in self.connections:
-            self.connections.remove(connection)
-        if connection in connection.node_from.connections:
-            connection.node_from.connections.remove(connection)
-        del connection
+        self.remove_connections([connection])
+
+    @_instrumented
+    def remove_connections(self, connections):
+        removed = False
+        for connection in connections:
+            removed = self._unlink(connection) or removed
+        if removed:
+            self._touch()
 
+    @_instrumented
     def add_connection(self, node_from, node_to, weight=1,
                        is_directional=None):
         is_directional = is_directional if is_directional is not None\
                          else self.is_directional
 
-        connection_1 = Connection(node_from=node_from, node_to=node_to,
-                                  weight=weight, graph=self)
-        connection_2 = Connection(node_from=node_to, node_to=node_from,
-                                  weight=weight, graph=self)
-
-        nodes_not_in_graph = {node_from, node_to}.difference(self.nodes)
+        nodes_not_in_graph = self._nodes_not_in_graph((node_from, node_to))
         if len(nodes_not_in_graph) > 0:
             raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
                                       graph=self.graph_id)
 
-        node_from.connections.add(connection_1)
-        self.connections.add(connection_1)
+        self._link(Connection(node_from=node_from, node_to=node_to,
+                              weight=weight, graph=self))
         if not is_directional:
-            node_to.connections.add(connection_2)
-            self.connections.add(connection_2)
+            self._link(Connection(node_from=node_to, node_to=node_from,
+                                  weight=weight, graph=self))
+        self._touch()
+
+        return True
+
+    @_instrumented
+    def add_connections(self, edges, is_directional=None):
+        is_directional = is_directional if is_directional is not None\
+                         else self.is_directional
+
+        edges = edges if isinstance(edges, list) else list(edges)
+        nodes_not_in_graph = self._nodes_not_in_graph(
+            node for edge in edges for node in edge[:2])
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph_id)
+
+        for edge in edges:
+            node_from, node_to = edge[0], edge[1]
+            weight = edge[2] if len(edge) > 2 else 1
+            self._link(Connection(node_from=node_from, node_to=node_to,
+                                  weight=weight, graph=self))
+            if not is_directional:
+                self._link(Connection(node_from=node_to, node_to=node_from,
+                                      weight=weight, graph=self))
+        self._touch()
 
         return True
 
+    @_instrumented
+    def include_nodes(self, nodes):
+        nodes = nodes if isinstance(nodes, list) else list(nodes)
+        node_ids = self._node_ids
+        new_ids = set()
+        for node in nodes:
+            if node.graph and (node.graph != self):
+                raise NodeAlreadyInAGraph(node=node)
+            registered = node_ids.get(node.node_id)
+            if registered is not None and registered is not node\
+               or node.node_id in new_ids:
+                raise NodeAlreadyExists(node=node.node_id)
+            if registered is None:
+                new_ids.add(node.node_id)
+        for node in nodes:
+            if node_ids.get(node.node_id) is not node:
+                self._register_node(node)
+            node.graph = self
+        self._touch()
+
+    def get_node(self, node_id, default=None):
+        return self._node_ids.get(node_id, default)
+
+    def _forget_node(self, node):
+        self.nodes.remove(node)
+        del self._node_ids[node.node_id]
+        self._degree_changed(node, node.degree, None)
+        self._components_stale = True
+
+    def _register_node(self, node):
+        self.nodes.add(node)
+        self._node_ids[node.node_id] = node
+        self._degree_changed(node, None, node.degree)
+        if not self._components_stale:
+            parent, size = self._component_maps
+            key = id(node)
+            if key not in parent:
+                parent[key] = key
+                size[key] = 1
+            for connection in node.connections:
+                self._union_components(parent, size,
+                                       id(connection.node_from),
+                                       id(connection.node_to))
+
+    def _degree_changed(self, node, old_degree, new_degree):
+        histogram = self._degree_histogram
+        if old_degree is not None:
+            self._degree_sum -= old_degree
+            histogram[old_degree] -= 1
+            if not histogram[old_degree]:
+                del histogram[old_degree]
+        if new_degree is None:
+            self._odd_nodes.discard(node)
+            self._even_nodes.discard(node)
+            return
+        self._degree_sum += new_degree
+        histogram[new_degree] = histogram.get(new_degree, 0) + 1
+        if new_degree % 2 == 0:
+            self._odd_nodes.discard(node)
+            self._even_nodes.add(node)
+        else:
+            self._even_nodes.discard(node)
+            self._odd_nodes.add(node)
+
+    def _link(self, connection):
+        node_connections = connection.node_from.connections
+        if connection not in node_connections:
+            degree = len(node_connections)
+            node_connections.add(connection)
+            self._degree_changed(connection.node_from, degree, degree + 1)
+        connection.node_to.incoming.add(connection)
+        self.connections.add(connection)
+        if not self._components_stale:
+            self._union_components(*self._component_maps,
+                                   id(connection.node_from),
+                                   id(connection.node_to))
+
+    def _unlink(self, connection):
+        node_connections = connection.node_from.connections
+        linked = connection in self.connections
+        if connection in node_connections:
+            linked = True
+            degree = len(node_connections)
+            node_connections.remove(connection)
+            if self._node_ids.get(connection.node_from.node_id)\
+               is connection.node_from:
+                self._degree_changed(connection.node_from, degree,
+                                     degree - 1)
+        self.connections.discard(connection)
+        connection.node_to.incoming.discard(connection)
+        if linked:
+            self._components_stale = True
+        return linked
+
+    @_instrumented
+    def connected(self, node_1, node_2):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_1, node_2))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph_id)
+        return self._same_component(node_1, node_2)
+
+    @_instrumented
+    def components(self):
+        parent, _ = self._refresh_components()
+        components = dict()
+        for node in self.nodes:
+            root = self._find_component(parent, id(node))
+            components.setdefault(root, set()).add(node)
+        return list(components.values())
+
+    def component_sizes(self):
+        _, size = self._refresh_components()
+        return sorted(size.values(), reverse=True)
+
+    def _same_component(self, node_1, node_2):
+        parent, _ = self._refresh_components()
+        return self._find_component(parent, id(node_1))\
+            == self._find_component(parent, id(node_2))
+
+    def _refresh_components(self):
+        if not self._components_stale:
+            return self._component_maps
+        with self._components_lock:
+            if self._components_stale:
+                parent = {id(node): id(node) for node in self.nodes}
+                size = dict.fromkeys(parent, 1)
+                for connection in self.connections:
+                    self._union_components(parent, size,
+                                           id(connection.node_from),
+                                           id(connection.node_to))
+                self._component_maps = (parent, size)
+                self._components_stale = False
+            return self._component_maps
+
+    @staticmethod
+    def _find_component(parent, key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    @staticmethod
+    def _union_components(parent, size, key_1, key_2):
+        if key_1 not in parent or key_2 not in parent:
+            return
+        root_1 = Graph._find_component(parent, key_1)
+        root_2 = Graph._find_component(parent, key_2)
+        if root_1 == root_2:
+            return
+        if size[root_1] < size[root_2]:
+            root_1, root_2 = root_2, root_1
+        parent[root_2] = root_1
+        size[root_1] += size.pop(root_2)
+
+    @_instrumented
     def matrix_to_graph(self, matrix, ordered=False, beggining_id=0):
         if len(self.nodes) > 0:
             message = 'The Graph you are trying to create already has nodes'
             raise GraphAlreadyHasNodes(message)
 
+        number_nodes = matrix.shape[0] if hasattr(matrix, 'shape')\
+            else len(matrix)
         if ordered:
             nodes = [Node(node_id=key+beggining_id, state='white') for
-                     key, line in enumerate(matrix)]
+                     key in range(number_nodes)]
         else:
-            nodes = [Node(state='white') for line in enumerate(matrix)]
+            nodes = [Node(state='white') for key in range(number_nodes)]
 
-        for node in nodes:
-            self.include_node(node)
-        for line_number, line in enumerate(matrix):
-            for column_number, element in enumerate(line):
-                if element == 1:
-                    self.add_connection(node_from=nodes[line_number],
-                                        node_to=nodes[column_number],
-                                        is_directional=True)
+        self.include_nodes(nodes)
+        self.add_connections([(nodes[line_number], nodes[column_number])
+                              for line_number, column_number
+                              in self._matrix_edges(matrix)],
+                             is_directional=True)
+
+        return True
+
+    @staticmethod
+    def _matrix_edges(matrix):
+        if hasattr(matrix, 'tocoo'):
+            coo = matrix.tocoo()
+            return [(int(line_number), int(column_number))
+                    for line_number, column_number, element
+                    in zip(coo.row, coo.col, coo.data) if element == 1]
+        if hasattr(matrix, 'nonzero') and hasattr(matrix, 'shape'):
+            line_numbers, column_numbers = (matrix == 1).nonzero()
+            return zip(line_numbers.tolist(), column_numbers.tolist())
+        return [(line_number, column_number)
+                for line_number, line in enumerate(matrix)
+                for column_number, element in enumerate(line)
+                if element == 1]
+
+    @_instrumented
+    def edges_to_graph(self, edges, is_directional=None):
+        nodes = self._node_ids
+        new_nodes = dict()
+        connections = list()
+        for edge in edges:
+            ends = list()
+            for node_id in edge[:2]:
+                node = nodes.get(node_id)
+                if node is None:
+                    node = new_nodes.get(node_id)
+                    if node is None:
+                        node = Node(node_id=node_id)
+                        new_nodes[node_id] = node
+                ends.append(node)
+            weight = edge[2] if len(edge) > 2 else 1
+            connections.append((ends[0], ends[1], weight))
+
+        self.include_nodes(list(new_nodes.values()))
+        self.add_connections(connections, is_directional=is_directional)
 
         return True
 
+    @_instrumented
+    def edge_list_to_graph(self, source, is_directional=None, **options):
+        status = ReadProgress()
+        callback = options.pop('progress', None)
+        for chunk in read_edge_list(source, progress=status, **options):
+            self.edges_to_graph(chunk, is_directional=is_directional)
+            status.elapsed = time.perf_counter() - status.started
+            if callback:
+                callback(status)
+        return status
+
+    @_instrumented
+    def adjacency_to_graph(self, adjacency):
+        nodes = self._node_ids
+        new_nodes = [Node(node_id=node_id) for node_id in adjacency
+                     if node_id not in nodes]
+        self.include_nodes(new_nodes)
+
+        edges = list()
+        for node_id, adjacent in adjacency.items():
+            weights = adjacent if isinstance(adjacent, dict)\
+                else dict.fromkeys(adjacent, 1)
+            for adjacent_id, weight in weights.items():
+                edges.append((node_id, adjacent_id, weight))
+
+        return self.edges_to_graph(edges, is_directional=True)
+
+    @_instrumented
     def copy_connections(self, other):
         if not isinstance(other, Graph):
             message = f'{other} is a {str(type(other))[7:-1]}, not a Graph'
             raise TypeError(message)
 
-        old_new_nodes = [(node, Node()) for node in self.nodes]
-        for _, new in old_new_nodes:
-            other.include_node(new)
+        old_new_nodes = {id(node): (node, Node()) for node in self.nodes}
+        for old, new in old_new_nodes.values():
+            new.weight = old.weight
+            new.state = old.state
+        other.include_nodes([new for _, new in old_new_nodes.values()])
 
-        for old_from, new_from in old_new_nodes:
-            new_from.weight = old_from.weight
-            new_from.state = old_from.state
-            new_from.graph = other
+        edges = list()
+        for old_from, new_from in old_new_nodes.values():
             for connection in old_from.connections:
-                to_connect = connection.node_to
-                for old_to, new_to in old_new_nodes:
-                    if to_connect == old_to:
-                        other.add_connection(new_from, new_to,
-                                             connection.weight,
-                                             is_directional=True)
-                        break
+                to_connect = old_new_nodes.get(id(connection.node_to))
+                if to_connect is not None:
+                    edges.append((new_from, to_connect[1], connection.weight))
+        other.add_connections(edges, is_directional=True)
 
         return other
 
+    def union_view(self, other):
+        return UnionView(self, other)
+
     def __eq__(self, other):
         if isinstance(other, Graph):
             return self.graph_id == other.graph_id
@@ -530,6 +1766,7 @@ class Graph:
     def __hash__(self):
         return hash((self.__graph_id))
 
+    @_instrumented
     def __add__(self, other):
         if not isinstance(self, Graph):
             message = f'{self} is a {str(type(self))[7:-1]}, not a Graph'
@@ -560,15 +1797,1054 @@ class Graph:
         return_text += f', connections=set([{connections}])'
         return return_text
 
-    def __str__(self):
-        connections = tuple([(connection.node_from.node_id,
-                              connection.node_to.node_id,)
-                             for connection in self.connections])
-        nodes = tuple([node.node_id for node in self.nodes])
 
-        return_text = f"G(V{nodes}, E{connections})"
+class _ChainedSet(Set):
+
+    def __init__(self, sets):
+        self.sets = tuple(sets)
+
+    def __contains__(self, element):
+        return any(element in elements for elements in self.sets)
+
+    def __iter__(self):
+        for elements in self.sets:
+            yield from elements
+
+    def __len__(self):
+        return sum(len(elements) for elements in self.sets)
+
+
+class UnionView(_ReadOnlyGraph):
+
+    def __init__(self, *graphs):
+        for graph in graphs:
+            if not isinstance(graph, Graph):
+                message = f'{graph} is a {str(type(graph))[7:-1]}'
+                message += ', not a Graph'
+                raise TypeError(message)
+        seen_ids = set()
+        for graph in graphs:
+            for node_id in graph._node_ids:
+                if node_id in seen_ids:
+                    raise NodeAlreadyExists(node=node_id)
+            seen_ids.update(graph._node_ids)
+        self.graphs = tuple(graphs)
+        self._distance_summary = None
+
+    @property
+    def graph_id(self):
+        return tuple(graph.graph_id for graph in self.graphs)
+
+    @property
+    def nodes(self):
+        return _ChainedSet(graph.nodes for graph in self.graphs)
+
+    @property
+    def connections(self):
+        return _ChainedSet(graph.connections for graph in self.graphs)
+
+    @property
+    def is_directional(self):
+        return any(graph.is_directional for graph in self.graphs)
+
+    @property
+    def is_weighted(self):
+        return any(graph.is_weighted for graph in self.graphs)
+
+    @property
+    def _version(self):
+        return tuple(graph._version for graph in self.graphs)
+
+    @property
+    def _node_ids(self):
+        return ChainMap(*(graph._node_ids for graph in self.graphs))
+
+    @property
+    def averege_degree(self):
+        degree_sum = sum(graph._degree_sum for graph in self.graphs)
+        return degree_sum/self.order
+
+    def even_degree_nodes(self):
+        return set().union(*(graph._even_nodes for graph in self.graphs))
+
+    def odd_degree_nodes(self):
+        return set().union(*(graph._odd_nodes for graph in self.graphs))
+
+    def degree_histogram(self):
+        histogram = dict()
+        for graph in self.graphs:
+            for degree, number in graph._degree_histogram.items():
+                histogram[degree] = histogram.get(degree, 0) + number
+        return histogram
+
+    def euler_walk(self):
+        odd_nodes = sum(len(graph._odd_nodes) for graph in self.graphs)
+        return odd_nodes <= 2
+
+    def get_node(self, node_id, default=None):
+        return self._node_ids.get(node_id, default)
+
+    def connected(self, node_1, node_2):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_1, node_2))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph_id)
+        return self._same_component(node_1, node_2)
+
+    def components(self):
+        return [component for graph in self.graphs
+                for component in graph.components()]
+
+    def component_sizes(self):
+        return sorted((size for graph in self.graphs
+                       for size in graph.component_sizes()), reverse=True)
+
+    def _adjacency(self, node):
+        return node.graph._adjacency(node)
+
+    def _connections_of(self, node):
+        return node.connections
+
+    def _incoming_of(self, node):
+        return node.incoming
+
+    def _same_component(self, node_1, node_2):
+        return node_1.graph is node_2.graph\
+            and node_1.graph._same_component(node_1, node_2)
+
+    def __repr__(self):
+        return_text = f'UnionView(graphs={self.graph_id}'
+        return_text += f', order={self.order}'
+        return_text += f', is_directional={self.is_directional})'
         return return_text
 
-    def __del__(self):
-        del self.graph_id
-        del self
+
+class _ConnectionSubset(Set):
+
+    def __init__(self, view):
+        self.view = view
+
+    def __contains__(self, connection):
+        node_from = connection.node_from
+        return node_from in self.view.nodes\
+            and connection in self.view._connections_of(node_from)
+
+    def __iter__(self):
+        for node in self.view.nodes:
+            yield from self.view._connections_of(node)
+
+    def __len__(self):
+        return sum(len(self.view._connections_of(node))
+                   for node in self.view.nodes)
+
+
+class SubgraphView(_ReadOnlyGraph):
+
+    def __init__(self, graph, nodes):
+        nodes = nodes if isinstance(nodes, list) else list(nodes)
+        nodes_not_in_graph = graph._nodes_not_in_graph(nodes)
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=nodes_not_in_graph,
+                                      graph=graph.graph_id)
+        if isinstance(graph, SubgraphView):
+            graph = graph.graph
+        if isinstance(graph, UnionView):
+            owners = [member for member in graph.graphs
+                      if not member._nodes_not_in_graph(nodes)]
+            if owners:
+                graph = owners[0]
+        self.graph = graph
+        self._members = frozenset(nodes)
+        self._members_version = graph._version
+        self._node_index = None
+        self._outgoing = dict()
+        self._incoming = dict()
+        self._filtered_version = graph._version
+        self._components_index = None
+        self._adjacency_cache = dict()
+        self._adjacency_version = graph._version
+        self._distance_summary = None
+
+    @property
+    def graph_id(self):
+        return self.graph.graph_id
+
+    @property
+    def nodes(self):
+        graph = self.graph
+        if self._members_version != graph._version:
+            node_ids = graph._node_ids
+            self._members = frozenset(node for node in self._members
+                                      if node_ids.get(node.node_id) is node)
+            self._members_version = graph._version
+            self._node_index = None
+        return self._members
+
+    @property
+    def connections(self):
+        return _ConnectionSubset(self)
+
+    @property
+    def is_directional(self):
+        return self.graph.is_directional
+
+    @property
+    def is_weighted(self):
+        return self.graph.is_weighted
+
+    @property
+    def _version(self):
+        return self.graph._version
+
+    @property
+    def _node_ids(self):
+        nodes = self.nodes
+        if self._node_index is None:
+            self._node_index = {node.node_id: node for node in nodes}
+        return self._node_index
+
+    @property
+    def averege_degree(self):
+        degree_sum = sum(len(self._connections_of(node))
+                         for node in self.nodes)
+        return degree_sum/self.order
+
+    def even_degree_nodes(self):
+        return {node for node in self.nodes
+                if len(self._connections_of(node)) % 2 == 0}
+
+    def odd_degree_nodes(self):
+        return {node for node in self.nodes
+                if len(self._connections_of(node)) % 2 == 1}
+
+    def degree_histogram(self):
+        histogram = dict()
+        for node in self.nodes:
+            degree = len(self._connections_of(node))
+            histogram[degree] = histogram.get(degree, 0) + 1
+        return histogram
+
+    def euler_walk(self):
+        return len(self.odd_degree_nodes()) <= 2
+
+    def get_node(self, node_id, default=None):
+        return self._node_ids.get(node_id, default)
+
+    def connected(self, node_1, node_2):
+        nodes_not_in_graph = self._nodes_not_in_graph((node_1, node_2))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph_id)
+        return self._same_component(node_1, node_2)
+
+    def components(self):
+        return [set(component) for component in self._components()[1]]
+
+    def component_sizes(self):
+        return sorted((len(component) for component in self._components()[1]),
+                      reverse=True)
+
+    def _same_component(self, node_1, node_2):
+        index = self._components()[0]
+        return index.get(node_1) == index.get(node_2)
+
+    def _components(self):
+        version = self.graph._version
+        if self._components_index is None\
+                or self._components_index[0] != version:
+            index = dict()
+            components = list()
+            for start in self.nodes:
+                if start in index:
+                    continue
+                index[start] = len(components)
+                component = [start]
+                to_check = [start]
+                while to_check:
+                    node = to_check.pop()
+                    adjacent = [connection.node_to for connection
+                                in self._connections_of(node)]
+                    adjacent += [connection.node_from for connection
+                                 in self._incoming_of(node)]
+                    for adjacent_node in adjacent:
+                        if adjacent_node not in index:
+                            index[adjacent_node] = len(components)
+                            component.append(adjacent_node)
+                            to_check.append(adjacent_node)
+                components.append(component)
+            self._components_index = (version, index, components)
+        return self._components_index[1:]
+
+    def _connections_of(self, node):
+        return self._filtered(node, self._outgoing, 'connections', 'node_to')
+
+    def _incoming_of(self, node):
+        return self._filtered(node, self._incoming, 'incoming', 'node_from')
+
+    def _filtered(self, node, cache, attribute, endpoint):
+        members = self.nodes
+        if self._filtered_version != self.graph._version:
+            self._outgoing.clear()
+            self._incoming.clear()
+            self._filtered_version = self.graph._version
+        connections = cache.get(node)
+        if connections is None:
+            connections = [connection
+                           for connection in getattr(node, attribute)
+                           if getattr(connection, endpoint) in members]
+            cache[node] = connections
+        return connections
+
+    def __repr__(self):
+        return_text = f'SubgraphView(graph={self.graph_id}'
+        return_text += f', order={self.order}'
+        return_text += f', is_directional={self.is_directional})'
+        return return_text
+
+
+class FrozenGraph:
+    __slots__ = ('__graph_id', '__node_ids', '__index', '__offsets',
+                 '__neighbors', '__weights', '__is_directional',
+                 '__is_weighted', '__distance_summary', '__path', '__buffer')
+
+    file_magic = b'PYGU'
+    file_version = 1
+    file_header = struct.Struct('<4sHHQQQ')
+
+    def __init__(self, node_ids, offsets, neighbors, weights=None,
+                 is_directional: 'bool' = False, is_weighted: 'bool' = False,
+                 graph_id=None):
+        if len(offsets) != len(node_ids) + 1:
+            message = 'offsets must have one entry more than node_ids'
+            raise ValueError(message)
+        if weights is None:
+            weights = array('d', [1])*len(neighbors)
+        if len(weights) != len(neighbors):
+            message = 'weights and neighbors must have the same length'
+            raise ValueError(message)
+        self.__graph_id = graph_id if graph_id else id(self)
+        if not isinstance(node_ids, (tuple, memoryview)):
+            node_ids = tuple(node_ids)
+        self.__node_ids = node_ids
+        self.__index = None
+        self.__offsets = offsets
+        self.__neighbors = neighbors
+        self.__weights = weights
+        self.__is_directional = is_directional
+        self.__is_weighted = is_weighted
+        self.__distance_summary = None
+        self.__path = None
+        self.__buffer = None
+
+    def save(self, path):
+        node_ids = self.__node_ids
+        int_ids = all(type(node_id) is int and -2**63 <= node_id < 2**63
+                      for node_id in node_ids)
+        if int_ids:
+            id_table = array('q', node_ids).tobytes()
+        else:
+            for node_id in node_ids:
+                if not isinstance(node_id, (int, float, str)):
+                    message = f'node id {node_id!r} can not be saved, '
+                    message += 'only int, float and str ids are supported'
+                    raise TypeError(message)
+            id_table = json.dumps(list(node_ids)).encode('utf-8')
+            id_table += b' '*(-len(id_table) % 8)
+
+        flags = self.__is_directional | self.__is_weighted << 1\
+            | (not int_ids) << 2
+        header = self.file_header.pack(self.file_magic, self.file_version,
+                                       flags, len(node_ids),
+                                       len(self.__neighbors), len(id_table))
+        with open(path, 'wb') as file:
+            file.write(header)
+            file.write(id_table)
+            for values, typecode in ((self.__offsets, 'q'),
+                                     (self.__neighbors, 'q'),
+                                     (self.__weights, 'd')):
+                values = array(typecode, values)
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                values.tofile(file)
+        return True
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        header_size = cls.file_header.size
+        if len(buffer) < header_size:
+            message = f'{path} is not a graph file of version '
+            message += f'{cls.file_version}'
+            raise ValueError(message)
+        magic, version, flags, number_nodes, number_connections, \
+            id_table_size = cls.file_header.unpack_from(buffer)
+        if magic != cls.file_magic or version != cls.file_version:
+            message = f'{path} is not a graph file of version '
+            message += f'{cls.file_version}'
+            raise ValueError(message)
+        expected_size = header_size + id_table_size\
+            + 8*(2*number_connections + number_nodes + 1)
+        if len(buffer) < expected_size:
+            message = f'{path} is truncated: expected {expected_size} bytes, '
+            message += f'found {len(buffer)}'
+            raise ValueError(message)
+
+        view = memoryview(buffer)
+        position = header_size + id_table_size
+        sections = list()
+        for length, typecode in ((number_nodes + 1, 'q'),
+                                 (number_connections, 'q'),
+                                 (number_connections, 'd')):
+            section = view[position:position + 8*length].cast(typecode)
+            if sys.byteorder != 'little':
+                section = array(typecode, section)
+                section.byteswap()
+            sections.append(section)
+            position += 8*length
+
+        id_table = view[header_size:header_size + id_table_size]
+        if flags & 4:
+            node_ids = tuple(json.loads(bytes(id_table).decode('utf-8')))
+        elif sys.byteorder != 'little':
+            node_ids = array('q', id_table.cast('q'))
+            node_ids.byteswap()
+            node_ids = tuple(node_ids)
+        else:
+            node_ids = id_table.cast('q')
+
+        frozen = cls(node_ids, *sections, is_directional=bool(flags & 1),
+                     is_weighted=bool(flags & 2))
+        frozen.__path = path
+        frozen.__buffer = buffer
+        return frozen
+
+    def thaw(self):
+        graph = Graph(is_directional=self.__is_directional,
+                      is_weighted=self.__is_weighted)
+        nodes = [Node(node_id=node_id) for node_id in self.__node_ids]
+        graph.include_nodes(nodes)
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        weights = self.__weights
+        edges = list()
+        for position, node in enumerate(nodes):
+            for edge in range(offsets[position], offsets[position+1]):
+                weight = weights[edge]
+                weight = int(weight) if weight.is_integer() else weight
+                edges.append((node, nodes[neighbors[edge]], weight))
+        graph.add_connections(edges, is_directional=True)
+        return graph
+
+    @property
+    def graph_id(self):
+        return self.__graph_id
+
+    @property
+    def node_ids(self):
+        return self.__node_ids
+
+    @property
+    def offsets(self):
+        return memoryview(self.__offsets).toreadonly()
+
+    @property
+    def neighbors(self):
+        return memoryview(self.__neighbors).toreadonly()
+
+    @property
+    def weights(self):
+        return memoryview(self.__weights).toreadonly()
+
+    @property
+    def is_directional(self):
+        return self.__is_directional
+
+    @property
+    def is_weighted(self):
+        return self.__is_weighted
+
+    @property
+    def order(self):
+        return len(self.__node_ids)
+
+    @property
+    def size(self):
+        if self.__is_directional:
+            return len(self.__neighbors)
+        return len(self.__neighbors)/2
+
+    @property
+    def averege_degree(self):
+        return len(self.__neighbors)/self.order
+
+    @property
+    def density(self):
+        number_nodes = self.order
+        number_connections = self.size
+        if self.__is_directional:
+            return (number_connections)/(number_nodes*(number_nodes-1))
+        return 2*(number_connections)/(number_nodes*(number_nodes-1))
+
+    @property
+    def diameter(self):
+        return self.distance_summary().diameter
+
+    @property
+    def averege_distance(self):
+        number_nodes = self.order
+        not_ordered_pairs = (number_nodes*(number_nodes-1))/2
+        sum_distance = self.distance_summary().distance_sum/2
+        averege_distance = sum_distance/not_ordered_pairs
+        return averege_distance
+
+    def eccentricities(self):
+        return dict(self.distance_summary().eccentricities)
+
+    def extreme_nodes(self):
+        return self.distance_summary().extreme_nodes
+
+    def distance_summary(self, workers=None):
+        if self.__distance_summary is None:
+            self.__distance_summary = self._all_pairs(workers)
+        return self.__distance_summary
+
+    def all_distances(self, workers=None):
+        distances = list()
+        self.__distance_summary = self._all_pairs(workers, distances)
+        return distances
+
+    def _all_pairs(self, workers=None, distances=None):
+        number_nodes = self.order
+        if workers and workers > 1 and number_nodes > 1:
+            chunk_size = max(1, -(-number_nodes//(workers*4)))
+            chunks = [range(start, min(start + chunk_size, number_nodes))
+                      for start in range(0, number_nodes, chunk_size)]
+            if self.__path is not None:
+                initializer = _init_csr_worker_from_file
+                initargs = (self.__path,)
+            else:
+                initializer = _init_csr_worker
+                initargs = (self.__offsets, self.__neighbors)
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=initializer,
+                                     initargs=initargs) as executor:
+                partials = list(executor.map(
+                    _csr_worker_chunk, chunks,
+                    repeat(distances is not None)))
+        else:
+            partials = [_csr_distance_chunk(self.__offsets, self.__neighbors,
+                                            range(number_nodes),
+                                            distances is not None)]
+
+        node_ids = self.__node_ids
+        eccentricities = dict()
+        distance_sum = 0
+        higher_distance = 0
+        nodes = None
+        for chunk_eccentricities, chunk_sum, chunk_higher, chunk_nodes,\
+                chunk_rows in partials:
+            if distances is not None:
+                for row in chunk_rows:
+                    distances.extend(row)
+            start = len(eccentricities)
+            for position, eccentricity in enumerate(chunk_eccentricities):
+                eccentricities[node_ids[start + position]] = eccentricity
+            distance_sum += chunk_sum
+            if chunk_higher > higher_distance:
+                higher_distance = chunk_higher
+                nodes = (node_ids[chunk_nodes[0]], node_ids[chunk_nodes[1]])
+
+        if higher_distance:
+            diameter = higher_distance
+        else:
+            diameter = False if number_nodes else None
+        return DistanceSummary(eccentricities, distance_sum, diameter, nodes)
+
+    def index_of(self, node):
+        node_id = node.node_id if isinstance(node, Node) else node
+        index = self._index()
+        if node_id not in index:
+            message = f'{node_id} Node is not in Graph {self.__graph_id}'
+            raise NodeNotInGraphError(message)
+        return index[node_id]
+
+    def _csr(self):
+        return self.__offsets, self.__neighbors
+
+    def _index(self):
+        if self.__index is None:
+            self.__index = {node_id: position for position, node_id
+                            in enumerate(self.__node_ids)}
+        return self.__index
+
+    def degree(self, node):
+        position = self.index_of(node)
+        return self.__offsets[position+1] - self.__offsets[position]
+
+    def neighbors_of(self, node):
+        position = self.index_of(node)
+        start, end = self.__offsets[position], self.__offsets[position+1]
+        return [self.__node_ids[neighbor]
+                for neighbor in self.__neighbors[start:end]]
+
+    def distances_from(self, node):
+        distances = self._distances_from_index(self.index_of(node))
+        node_ids = self.__node_ids
+        return {node_ids[position]: distance
+                for position, distance in distances.items()}
+
+    def distance_between_not_weighted(self, node_1, node_2):
+        source = self.index_of(node_1)
+        target = self.index_of(node_2)
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        distances = {source: 0}
+        to_check = deque([source])
+        while to_check:
+            position = to_check.popleft()
+            distance = distances[position] + 1
+            for neighbor in neighbors[offsets[position]:offsets[position+1]]:
+                if neighbor not in distances:
+                    if neighbor == target:
+                        return distance
+                    distances[neighbor] = distance
+                    to_check.append(neighbor)
+
+        return False
+
+    def distance_between_weighted(self, node_1, node_2):
+        source = self.index_of(node_1)
+        target = self.index_of(node_2)
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        weights = self.__weights
+        best = {source: 0}
+        done = set()
+        to_check = [(0, source)]
+        while to_check:
+            distance, position = heapq.heappop(to_check)
+            if position in done:
+                continue
+            if position == target:
+                return int(distance) if float(distance).is_integer()\
+                    else distance
+            done.add(position)
+            for edge in range(offsets[position], offsets[position+1]):
+                neighbor = neighbors[edge]
+                if neighbor in done:
+                    continue
+                if weights[edge] < 0:
+                    message = f'negative weight in connection {edge}'
+                    raise ValueError(message)
+                new_distance = distance + weights[edge]
+                if neighbor not in best or new_distance < best[neighbor]:
+                    best[neighbor] = new_distance
+                    heapq.heappush(to_check, (new_distance, neighbor))
+
+        return False
+
+    def breadth_first_search(self, node_from):
+        source = self.index_of(node_from)
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        node_ids = self.__node_ids
+        visited = bytearray(self.order)
+        visited[source] = 1
+        order = [node_ids[source]]
+        to_check = deque([source])
+        while to_check:
+            position = to_check.popleft()
+            for neighbor in neighbors[offsets[position]:offsets[position+1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    order.append(node_ids[neighbor])
+                    to_check.append(neighbor)
+
+        return order
+
+    def bfs(self, node_from, max_depth=None):
+        return self._bfs(self.index_of(node_from), max_depth)
+
+    def _bfs(self, source, max_depth):
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        node_ids = self.__node_ids
+        visited = bytearray(self.order)
+        visited[source] = 1
+        to_check = deque([(source, 0)])
+        yield node_ids[source], 0, None
+        while to_check:
+            position, depth = to_check.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for neighbor in neighbors[offsets[position]:offsets[position+1]]:
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    to_check.append((neighbor, depth + 1))
+                    yield node_ids[neighbor], depth + 1, node_ids[position]
+
+    def dfs(self, node_from, max_depth=None):
+        return self._dfs(self.index_of(node_from), max_depth)
+
+    def _dfs(self, source, max_depth):
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        node_ids = self.__node_ids
+        visited = bytearray(self.order)
+        visited[source] = 1
+        yield node_ids[source], 0, None
+        if max_depth is not None and max_depth <= 0:
+            return
+        stack = [(source, offsets[source])]
+        while stack:
+            position, cursor = stack[-1]
+            end = offsets[position+1]
+            while cursor < end and visited[neighbors[cursor]]:
+                cursor += 1
+            if cursor == end:
+                stack.pop()
+                continue
+            neighbor = neighbors[cursor]
+            stack[-1] = (position, cursor + 1)
+            visited[neighbor] = 1
+            depth = len(stack)
+            yield node_ids[neighbor], depth, node_ids[position]
+            if max_depth is None or depth < max_depth:
+                stack.append((neighbor, offsets[neighbor]))
+
+    def clustering_coefficient(self, node):
+        position = self.index_of(node)
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        adjacent_nodes = neighbors[offsets[position]:offsets[position+1]]
+        adjacent_set = set(adjacent_nodes)
+        number_connections = 0
+        for adjacent in adjacent_nodes:
+            for neighbor in neighbors[offsets[adjacent]:offsets[adjacent+1]]:
+                if neighbor in adjacent_set:
+                    number_connections += 1
+
+        return _coefficient(len(adjacent_nodes), number_connections,
+                            self.__is_directional)
+
+    @property
+    def averege_clustering(self):
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        adjacency = [neighbors[offsets[position]:offsets[position+1]]
+                     for position in range(self.order)]
+        coefficients = _clustering_coefficients(adjacency,
+                                                self.__is_directional)
+        return sum(coefficients)/self.order
+
+    def _distances_from_index(self, source):
+        offsets = self.__offsets
+        neighbors = self.__neighbors
+        distances = {source: 0}
+        to_check = deque([source])
+        while to_check:
+            position = to_check.popleft()
+            distance = distances[position] + 1
+            for neighbor in neighbors[offsets[position]:offsets[position+1]]:
+                if neighbor not in distances:
+                    distances[neighbor] = distance
+                    to_check.append(neighbor)
+        return distances
+
+    def __len__(self):
+        return self.order
+
+    def __contains__(self, node):
+        node_id = node.node_id if isinstance(node, Node) else node
+        return node_id in self._index()
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenGraph):
+            return self.graph_id == other.graph_id
+        return False
+
+    def __hash__(self):
+        return hash((self.__graph_id))
+
+    def __repr__(self):
+        return_text = f'FrozenGraph(graph_id={self.graph_id}'
+        return_text += f', order={self.order}'
+        return_text += f', size={self.size}'
+        return_text += f', is_directional={self.is_directional}'
+        return_text += f', is_weighted={self.is_weighted})'
+        return return_text
+
+
+class AsyncGraph:
+    inline_queries = frozenset(['order', 'size', 'density',
+                                'averege_degree', 'degree_histogram',
+                                'even_degree_nodes', 'odd_degree_nodes'])
+
+    def __init__(self, graph, executor=None, max_concurrency=4,
+                 max_pending=1024, batch_delay=0.001):
+        self.graph = graph
+        self.executor = executor
+        self.batch_delay = batch_delay
+        self._processes = isinstance(executor, ProcessPoolExecutor)
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._in_flight = dict()
+        self._batches = dict()
+        self._snapshot = None
+        self._snapshot_users = dict()
+        self._snapshot_tasks = dict()
+        self._access = asyncio.Condition()
+        self._readers = 0
+        self._writers = 0
+        self.computed = 0
+        self.coalesced = 0
+        self.batched = 0
+
+    async def query(self, name, *args):
+        if name in self.inline_queries:
+            return _run_query(self.graph, name, args)
+        key = (name, self.graph._version)\
+            + tuple(self._argument(arg) for arg in args)
+        async with self._pending:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = asyncio.ensure_future(self._query(name, args))
+                self._track(key, future)
+            else:
+                self.coalesced += 1
+            return await asyncio.shield(future)
+
+    async def distance(self, node_1, node_2):
+        nodes_not_in_graph = self.graph._nodes_not_in_graph((node_1, node_2))
+        if len(nodes_not_in_graph) > 0:
+            raise NodeNotInGraphError(nodes=list(nodes_not_in_graph),
+                                      graph=self.graph.graph_id)
+        key = ('distance', self.graph._version, node_1.node_id,
+               node_2.node_id)
+        async with self._pending:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return await asyncio.shield(future)
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._track(key, future)
+            batch = self._batches.get(node_1)
+            if batch is None:
+                batch = dict()
+                self._batches[node_1] = batch
+                loop.call_later(self.batch_delay, self._flush, node_1)
+            else:
+                self.batched += 1
+            batch[node_2] = future
+            return await asyncio.shield(future)
+
+    async def distances(self, pairs):
+        return await asyncio.gather(*(self.distance(node_1, node_2)
+                                      for node_1, node_2 in pairs))
+
+    async def clustering_coefficient(self, node):
+        return await self.query('clustering_coefficient', node)
+
+    async def averege_clustering(self):
+        return await self.query('averege_clustering')
+
+    async def diameter(self):
+        return await self.query('diameter')
+
+    async def averege_distance(self):
+        return await self.query('averege_distance')
+
+    async def eccentricities(self):
+        return await self.query('eccentricities')
+
+    async def weighted_distance(self, node_1, node_2):
+        return await self.query('distance_between_weighted', node_1, node_2)
+
+    async def update(self, name, *args):
+        async with self._access:
+            self._writers += 1
+            try:
+                await self._access.wait_for(lambda: not self._readers)
+                return getattr(self.graph, name)(*args)
+            finally:
+                self._writers -= 1
+                self._access.notify_all()
+
+    async def include_nodes(self, nodes):
+        return await self.update('include_nodes', nodes)
+
+    async def remove_nodes(self, nodes):
+        return await self.update('remove_nodes', nodes)
+
+    async def add_connection(self, node_from, node_to, weight=1,
+                             is_directional=None):
+        return await self.update('add_connection', node_from, node_to,
+                                 weight, is_directional)
+
+    async def add_connections(self, edges, is_directional=None):
+        return await self.update('add_connections', edges, is_directional)
+
+    async def remove_connections(self, connections):
+        return await self.update('remove_connections', connections)
+
+    def averege_degree(self):
+        return self.graph.averege_degree
+
+    def degree_histogram(self):
+        return self.graph.degree_histogram()
+
+    def stats(self):
+        return {'computed': self.computed, 'coalesced': self.coalesced,
+                'batched': self.batched, 'in_flight': len(self._in_flight)}
+
+    async def close(self):
+        futures = list(self._in_flight.values())
+        futures += list(self._snapshot_tasks.values())
+        if futures:
+            await asyncio.gather(*futures, return_exceptions=True)
+        if self._snapshot is not None:
+            self._release_snapshot(self._snapshot[1])
+            self._snapshot = None
+        for path, users in list(self._snapshot_users.items()):
+            if not users:
+                del self._snapshot_users[path]
+                os.remove(path)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _flush(self, source):
+        batch = self._batches.pop(source)
+        targets = list(batch)
+        if self._processes:
+            name, args = 'distances_from', (source,)
+        else:
+            name, args = 'distances_not_weighted', (source, targets)
+        task = asyncio.ensure_future(self._compute(name, args))
+        task.add_done_callback(partial(self._resolve, source, batch))
+
+    def _resolve(self, source, batch, task):
+        if task.cancelled():
+            for future in batch.values():
+                future.cancel()
+            return
+        exception = task.exception()
+        for target, future in batch.items():
+            if future.done():
+                continue
+            if exception is not None:
+                future.set_exception(exception)
+            elif target is source:
+                future.set_result(False)
+            else:
+                reached = task.result()
+                target = target.node_id if self._processes else target
+                future.set_result(reached.get(target, False))
+
+    def _track(self, key, future):
+        self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+    async def _query(self, name, args):
+        result = await self._compute(name, args)
+        if self._processes:
+            result = self._restore(name, result)
+        return result
+
+    def _restore(self, name, result):
+        node_ids = self.graph._node_ids
+        if name == 'eccentricities':
+            return {node_ids[node_id]: eccentricity
+                    for node_id, eccentricity in result.items()}
+        if name == 'extreme_nodes' and result is not None:
+            return tuple(node_ids[node_id] for node_id in result)
+        if name == 'distance_summary':
+            return DistanceSummary(
+                self._restore('eccentricities', result.eccentricities),
+                result.distance_sum, result.diameter,
+                self._restore('extreme_nodes', result.extreme_nodes),
+                version=result.version)
+        if name == 'breadth_first_search':
+            return True
+        return result
+
+    async def _compute(self, name, args):
+        loop = asyncio.get_running_loop()
+        async with self._running:
+            async with self._access:
+                await self._access.wait_for(lambda: not self._writers)
+                self._readers += 1
+            try:
+                self.computed += 1
+                if not self._processes:
+                    return await loop.run_in_executor(
+                        self.executor, _run_query, self.graph, name, args)
+                path = await self._acquire_snapshot()
+                try:
+                    args = tuple(self._argument(arg) for arg in args)
+                    return await loop.run_in_executor(
+                        self.executor, _run_frozen_query, path, name, args)
+                finally:
+                    self._release_snapshot(path)
+            finally:
+                async with self._access:
+                    self._readers -= 1
+                    self._access.notify_all()
+
+    async def _acquire_snapshot(self):
+        while True:
+            version = self.graph._version
+            if self._snapshot is not None and self._snapshot[0] == version:
+                path = self._snapshot[1]
+            else:
+                task = self._snapshot_tasks.get(version)
+                if task is None:
+                    task = asyncio.ensure_future(
+                        self._write_snapshot(version, self.graph.freeze()))
+                    self._snapshot_tasks[version] = task
+                path = await asyncio.shield(task)
+            if path in self._snapshot_users:
+                self._snapshot_users[path] += 1
+                return path
+
+    async def _write_snapshot(self, version, frozen):
+        descriptor, path = tempfile.mkstemp(suffix='.pygu')
+        os.close(descriptor)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, frozen.save, path)
+        except BaseException:
+            os.remove(path)
+            raise
+        finally:
+            del self._snapshot_tasks[version]
+        if self._snapshot is None or self._snapshot[0] < version:
+            if self._snapshot is not None:
+                self._release_snapshot(self._snapshot[1])
+            self._snapshot = (version, path)
+            self._snapshot_users[path] = 1
+        else:
+            self._snapshot_users[path] = 0
+        return path
+
+    def _release_snapshot(self, path):
+        self._snapshot_users[path] -= 1
+        if not self._snapshot_users[path]:
+            del self._snapshot_users[path]
+            os.remove(path)
+
+    @staticmethod
+    def _argument(arg):
+        return arg.node_id if isinstance(arg, Node) else arg
+
+    def __repr__(self):
+        executor = type(self.executor).__name__ if self.executor else None
+        return_text = f'AsyncGraph(graph={self.graph.graph_id}'
+        return_text += f', executor={executor}'
+        return_text += f', in_flight={len(self._in_flight)})'
+        return return_text